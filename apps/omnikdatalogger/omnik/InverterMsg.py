@@ -5,6 +5,31 @@ import struct  # Converting bytes to numbers
 import datetime
 import time
 
+try:
+    # NumPy is only needed for batch decoding using decode_frames
+    import numpy
+except ImportError:
+    numpy = None
+
+# Layout of the inverter message starting at offset 15:
+# ID (16 chars), temperature, VPV1-3, IPV1-3, IAC1-3, VAC1-3,
+# (FAC, PAC)1-3 interleaved, EToday (shorts) followed by ETotal and HTotal (longs)
+FRAME = struct.Struct("!16s20H2I")
+FRAME_OFFSET = 15
+# The field names for the values per phase or string in the order FetchDataDict sets them
+PHASE_FIELDS = tuple(
+    tuple(f"{name}{i}" for i in [1, 2, 3])
+    for name in [
+        "current_ac",
+        "voltage_ac",
+        "frequency_ac",
+        "power_ac",
+        "voltage_pv",
+        "current_pv",
+        "power_pv",
+    ]
+)
+
 
 class InverterMsg:
 
@@ -16,6 +41,13 @@ class InverterMsg:
         self.offset = offset
         # Set a timestamp
         self.last_update = time.time()
+        self._fields = None
+
+    def _decode(self):
+        # Unpack all fields of the message at once
+        if self._fields is None:
+            self._fields = FRAME.unpack_from(memoryview(self.rawmsg), FRAME_OFFSET)
+        return self._fields
 
     def __getString(self, begin, end):
         return str(self.rawmsg[begin:end], encoding="UTF-8")
@@ -119,6 +151,10 @@ class InverterMsg:
                 max = item
         return max
 
+    @staticmethod
+    def _short(num, devider=10):
+        return -1 if num == 65535 else float(num) / devider
+
     def FetchDataDict(self, data):
         if data:
             if not isinstance(data, dict):
@@ -126,6 +162,18 @@ class InverterMsg:
                 raise Exception("data object is not a dict")
         else:
             data = {}
+        # Decode the message in a single pass, the results are equal to using the getters
+        fields = self._decode()
+        short = self._short
+        vpv = [short(num) for num in fields[2:5]]
+        ipv = [short(num) for num in fields[5:8]]
+        vac = [short(num) for num in fields[11:14]]
+        fac = [short(num, 100) for num in fields[14:20:2]]
+        pac = [int(short(num, 1)) for num in fields[15:21:2]]
+        ppv = [
+            0 if not ipv[i] else -1 if ipv[i] < 0 else int(vpv[i] * ipv[i])
+            for i in range(3)
+        ]
         # Fill the dict
         # Get timestamp string and epoch
         data["last_update_time"] = datetime.datetime.utcfromtimestamp(
@@ -133,39 +181,23 @@ class InverterMsg:
         ).strftime("%Y-%m-%dT%H:%M:%SZ")
         data["last_update"] = self.last_update
         # Set the serial number
-        data["inverter"] = self.getID()
-        data["current_power"] = self.getPower()
-        data["today_energy"] = self.getEToday()
-        data["total_energy"] = self.getETotal()
-        data["inverter_temperature"] = self.getTemp()
-        self.setIfValid("current_ac1", data, self.getIACalt(1))
-        self.setIfValid("current_ac2", data, self.getIACalt(2))
-        self.setIfValid("current_ac3", data, self.getIACalt(3))
-        self.setIfValid("voltage_ac1", data, self.getVAC(1))
-        self.setIfValid("voltage_ac2", data, self.getVAC(2))
-        self.setIfValid("voltage_ac3", data, self.getVAC(3))
-        self.setIfValid("frequency_ac1", data, self.getFAC(1))
-        self.setIfValid("frequency_ac2", data, self.getFAC(2))
-        self.setIfValid("frequency_ac3", data, self.getFAC(3))
-        self.setIfValid("power_ac1", data, self.getPAC(1))
-        self.setIfValid("power_ac2", data, self.getPAC(2))
-        self.setIfValid("power_ac3", data, self.getPAC(3))
-        self.setIfValid("voltage_pv1", data, self.getVPV(1))
-        self.setIfValid("voltage_pv2", data, self.getVPV(2))
-        self.setIfValid("voltage_pv3", data, self.getVPV(3))
-        self.setIfValid("current_pv1", data, self.getIPV(1))
-        self.setIfValid("current_pv2", data, self.getIPV(2))
-        self.setIfValid("current_pv3", data, self.getIPV(3))
-        self.setIfValid("power_pv1", data, self.getPPV(1))
-        self.setIfValid("power_pv2", data, self.getPPV(2))
-        self.setIfValid("power_pv3", data, self.getPPV(3))
-        self.setIfValid("operation_hours", data, self.getHTotal())
-        self.setIfValid("current_power_pv", data, self.getPVPower())
+        data["inverter"] = str(fields[0], encoding="UTF-8")
+        data["current_power"] = pac[0]
+        data["today_energy"] = short(fields[20], 100)
+        data["total_energy"] = float(fields[21]) / 10
+        data["inverter_temperature"] = short(fields[1])
+        iac = [
+            round(pac[i] / vac[i], 2) if pac[i] >= 0 and vac[i] > 0 else -1
+            for i in range(3)
+        ]
+        for keys, values in zip(PHASE_FIELDS, [iac, vac, fac, pac, vpv, ipv, ppv]):
+            for key, value in zip(keys, values):
+                self.setIfValid(key, data, value)
+        self.setIfValid("operation_hours", data, int(float(fields[22])))
         self.setIfValid(
-            "voltage_ac_max",
-            data,
-            self._maxoflist([self.getVAC(1), self.getVAC(2), self.getVAC(3)]),
+            "current_power_pv", data, sum(power for power in ppv if power > 0)
         )
+        self.setIfValid("voltage_ac_max", data, self._maxoflist(vac))
 
 
 def request_string(ser):
@@ -188,3 +220,94 @@ def request_string(ser):
     cs = bytes.fromhex(hex(cs_count)[-2:])
     responseString += b"".join(hexlist) + b"".join([b"\x01\x00", cs, b"\x16"])
     return responseString
+
+
+# Big-endian fields of an inverter message at the offsets used by InverterMsg
+FRAME_FIELDS = {
+    "inverter": ("S16", 15),
+    "inverter_temperature": (">u2", 31),
+    "voltage_pv1": (">u2", 33),
+    "voltage_pv2": (">u2", 35),
+    "voltage_pv3": (">u2", 37),
+    "current_pv1": (">u2", 39),
+    "current_pv2": (">u2", 41),
+    "current_pv3": (">u2", 43),
+    "voltage_ac1": (">u2", 51),
+    "voltage_ac2": (">u2", 53),
+    "voltage_ac3": (">u2", 55),
+    "frequency_ac1": (">u2", 57),
+    "power_ac1": (">u2", 59),
+    "frequency_ac2": (">u2", 61),
+    "power_ac2": (">u2", 63),
+    "frequency_ac3": (">u2", 65),
+    "power_ac3": (">u2", 67),
+    "today_energy": (">u2", 69),
+    "total_energy": (">u4", 71),
+    "operation_hours": (">u4", 75),
+}
+
+
+def decode_frames(buffer, frame_size=128):
+    """
+    Decode a batch of inverter messages at once using NumPy.
+    The buffer contains N frames of frame_size bytes each (e.g. the joined base64 decoded
+    payloads captured from the localproxy plugins). A dict with an array per field is returned.
+    The fields and values are the same as returned by InverterMsg.FetchDataDict, but invalid
+    values are set to -1 instead of leaving the field out.
+    """
+    if numpy is None:
+        raise Exception("NumPy is required for batch decoding of inverter messages")
+    dtype = numpy.dtype(
+        {
+            "names": list(FRAME_FIELDS),
+            "formats": [FRAME_FIELDS[field][0] for field in FRAME_FIELDS],
+            "offsets": [FRAME_FIELDS[field][1] for field in FRAME_FIELDS],
+            "itemsize": frame_size,
+        }
+    )
+    frames = numpy.frombuffer(buffer, dtype=dtype)
+
+    def short(field, devider=10):
+        num = frames[field].astype(numpy.float64)
+        return numpy.where(num == 65535, -1.0, num / devider)
+
+    def power(field):
+        num = frames[field].astype(numpy.int64)
+        return numpy.where(num == 65535, -1, num)
+
+    data = {
+        "inverter": numpy.char.decode(frames["inverter"], "UTF-8"),
+        "today_energy": short("today_energy", 100),
+        "total_energy": frames["total_energy"].astype(numpy.float64) / 10,
+        "inverter_temperature": short("inverter_temperature"),
+        "operation_hours": frames["operation_hours"].astype(numpy.int64),
+    }
+    for i in [1, 2, 3]:
+        data[f"voltage_ac{i}"] = short(f"voltage_ac{i}")
+        data[f"frequency_ac{i}"] = short(f"frequency_ac{i}", 100)
+        data[f"power_ac{i}"] = power(f"power_ac{i}")
+        data[f"voltage_pv{i}"] = short(f"voltage_pv{i}")
+        data[f"current_pv{i}"] = short(f"current_pv{i}")
+        # Calculate current from power and voltage
+        pac = data[f"power_ac{i}"]
+        vac = data[f"voltage_ac{i}"]
+        valid = (pac >= 0) & (vac > 0)
+        data[f"current_ac{i}"] = numpy.where(
+            valid, numpy.round(pac / numpy.where(valid, vac, 1.0), 2), -1.0
+        )
+        # Calculate the string power, 0 if there is no current, -1 if it is invalid
+        vpv = data[f"voltage_pv{i}"]
+        ipv = data[f"current_pv{i}"]
+        data[f"power_pv{i}"] = (
+            numpy.where(ipv == 0, 0, numpy.where(ipv < 0, -1, numpy.trunc(vpv * ipv)))
+            .astype(numpy.int64)
+            .clip(min=-1)
+        )
+    data["current_power"] = data["power_ac1"]
+    data["current_power_pv"] = sum(
+        numpy.maximum(data[f"power_pv{i}"], 0) for i in [1, 2, 3]
+    )
+    data["voltage_ac_max"] = numpy.maximum.reduce(
+        [data["voltage_ac1"], data["voltage_ac2"], data["voltage_ac3"]]
+    ).clip(min=-1.0)
+    return data
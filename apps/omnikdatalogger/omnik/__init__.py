@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, timezone
 import threading
 
 from omnik.ha_logger import hybridlogger
+from omnik.scheduler import Worker
 
 logging.basicConfig(stream=sys.stdout, level=os.environ.get("LOGLEVEL", logging.INFO))
 
@@ -35,6 +36,7 @@ class RepeatedJob(object):
         self.logger = logger
         self.hass_api = hass_api
         self.datalogger = datalogger
+        self.scheduler = datalogger.scheduler
         self.client = datalogger.client
         self.args = args
         self.kwargs = kwargs
@@ -45,6 +47,8 @@ class RepeatedJob(object):
         self.use_timer = datalogger.client.use_timer
         if self.use_timer:
             self._timer = None
+            # The poll waits for the plants to respond, it runs in its own worker to keep the scheduler free
+            self._poll_worker = Worker(logger, hass_api, name="poll")
             self.interval = int(c.get("default", "interval", fallback=360))
             self.half_interval = self.interval / 2
             self.retries = 0
@@ -68,7 +72,11 @@ class RepeatedJob(object):
         if self.last_update_time:
             # Reset retry counter
             self.retries = 0
-            if self.last_update_time <= datetime.now(timezone.utc):
+            # Poll just after the next expected report when the report cadence was learned (adaptive_interval)
+            next_poll = self.datalogger.next_poll_time()
+            if next_poll and self.last_update_time <= datetime.now(timezone.utc):
+                self.new_report_expected_at = next_poll
+            elif self.last_update_time <= datetime.now(timezone.utc):
                 # If last report time + 2x interval is less than the current time then increase
                 self.new_report_expected_at = self.last_update_time + timedelta(
                     seconds=self.interval
@@ -122,19 +130,20 @@ class RepeatedJob(object):
         if self.use_timer:
             # starting actual timer
             if not self.is_running:
-                self._timer = threading.Timer(self.calculated_interval, self._run)
-                self._timer.daemon = True
-                self._timer.start()
+                self._timer = self.scheduler.schedule(
+                    self.calculated_interval, self._poll_worker.submit, self._run
+                )
                 self.is_running = True
         else:
             # use a listing thread to process
             self.listenthread = threading.Thread(target=self._listen_to_events)
             self.listenthread.start()
 
-    def stop(self):
-        """Cancel the timer."""
+    def stop(self, timeout=None):
+        """Cancel the timer, a running poll is waited for at most timeout seconds."""
         if self.use_timer:
             self._timer.cancel()
+            self._poll_worker.stop(timeout)
         else:
             # exit event message loop
             self.msgevent.set()
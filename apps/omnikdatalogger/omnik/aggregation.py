@@ -0,0 +1,133 @@
+"""Aggregate the data of multiple plants, `aggregate` in data_fields.json overrides the defaults."""
+
+from decimal import Decimal
+
+AGGREGATE_OPERATORS = ["sum", "max", "min", "last", "mean"]
+
+ZERO = Decimal("0")
+
+# The built-in operators, used for fields without `aggregate` in data_fields.json
+DEFAULT_AGGREGATES = {
+    "last_update": "max",
+    "today_energy": "sum",
+    "total_energy": "sum",
+    "current_power": "sum",
+    "voltage_ac_max": "max",
+    "voltage_ac1": "max",
+    "voltage_ac2": "max",
+    "voltage_ac3": "max",
+    "net_voltage_max": "max",
+    "current_ac1": "max",
+    "current_ac2": "max",
+    "current_ac3": "max",
+    "inverter_temperature": "max",
+    "power_consumption": "sum",
+    "energy_used_net": "sum",
+    "energy_used": "sum",
+    "INSTANTANEOUS_VOLTAGE_L1": "max",
+    "INSTANTANEOUS_VOLTAGE_L2": "max",
+    "INSTANTANEOUS_VOLTAGE_L3": "max",
+    "timestamp": "last",
+    "ELECTRICITY_USED_TARIFF_1": "last",
+    "ELECTRICITY_USED_TARIFF_2": "last",
+    "ELECTRICITY_DELIVERED_TARIFF_1": "last",
+    "ELECTRICITY_DELIVERED_TARIFF_2": "last",
+    "ELECTRICITY_ACTIVE_TARIFF": "last",
+    "energy_delivered_net": "sum",
+    "CURRENT_ELECTRICITY_USAGE": "sum",
+    "CURRENT_ELECTRICITY_DELIVERY": "sum",
+    "LONG_POWER_FAILURE_COUNT": "sum",
+    "SHORT_POWER_FAILURE_COUNT": "sum",
+    "VOLTAGE_SAG_L1_COUNT": "sum",
+    "VOLTAGE_SAG_L2_COUNT": "sum",
+    "VOLTAGE_SAG_L3_COUNT": "sum",
+    "VOLTAGE_SWELL_L1_COUNT": "sum",
+    "VOLTAGE_SWELL_L2_COUNT": "sum",
+    "VOLTAGE_SWELL_L3_COUNT": "sum",
+    "INSTANTANEOUS_ACTIVE_POWER_L1_POSITIVE": "sum",
+    "INSTANTANEOUS_ACTIVE_POWER_L2_POSITIVE": "sum",
+    "INSTANTANEOUS_ACTIVE_POWER_L3_POSITIVE": "sum",
+    "INSTANTANEOUS_ACTIVE_POWER_L1_NEGATIVE": "sum",
+    "INSTANTANEOUS_ACTIVE_POWER_L2_NEGATIVE": "sum",
+    "INSTANTANEOUS_ACTIVE_POWER_L3_NEGATIVE": "sum",
+    "current_net_power": "sum",
+    "current_net_power_l1": "sum",
+    "current_net_power_l2": "sum",
+    "current_net_power_l3": "sum",
+    "INSTANTANEOUS_CURRENT_L1": "sum",
+    "INSTANTANEOUS_CURRENT_L2": "sum",
+    "INSTANTANEOUS_CURRENT_L3": "sum",
+    "net_current_l1": "sum",
+    "net_current_l2": "sum",
+    "net_current_l3": "sum",
+    "timestamp_gas": "last",
+    "gas_consumption_total": "sum",
+    "gas_consumption_hour": "sum",
+}
+
+
+class AggregatedData(dict):
+    """The aggregated values, keeps the number of values added for the mean operator."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counts = {}
+
+    def clear(self):
+        super().clear()
+        self.counts.clear()
+
+
+class AggregationPlan(object):
+    """The fields to aggregate grouped by operator."""
+
+    def __init__(self, data_field_config):
+        operators = dict(DEFAULT_AGGREGATES)
+        for field, field_config in data_field_config.items():
+            if "aggregate" in field_config:
+                # null disables the aggregation of a field
+                operators[field] = field_config["aggregate"]
+        self.fields = {operator: [] for operator in AGGREGATE_OPERATORS}
+        # Fields with an unknown operator
+        self.invalid = {}
+        for field, operator in operators.items():
+            if operator is None:
+                continue
+            if operator in self.fields:
+                self.fields[operator].append(field)
+            else:
+                self.invalid[field] = operator
+        self.sum_fields = tuple(self.fields["sum"])
+        self.max_fields = tuple(self.fields["max"])
+        self.min_fields = tuple(self.fields["min"])
+        self.last_fields = tuple(self.fields["last"])
+        self.mean_fields = tuple(self.fields["mean"])
+
+    def add(self, aggregated, data):
+        """Add the values of a plant to the aggregated data, sum and max start at zero."""
+        for field in self.sum_fields:
+            if field in data:
+                aggregated[field] = aggregated.get(field, ZERO) + data[field]
+        for field in self.max_fields:
+            if field in data:
+                value = aggregated.get(field, ZERO)
+                aggregated[field] = data[field] if data[field] > value else value
+        for field in self.min_fields:
+            if field in data and (
+                field not in aggregated or data[field] < aggregated[field]
+            ):
+                aggregated[field] = data[field]
+        for field in self.last_fields:
+            if field in data:
+                aggregated[field] = data[field]
+        if self.mean_fields:
+            self._add_mean(aggregated, data)
+
+    def _add_mean(self, aggregated, data):
+        counts = aggregated.counts
+        for field in self.mean_fields:
+            if field in data:
+                # Running mean
+                counts[field] = count = counts.get(field, 0) + 1
+                mean = aggregated.get(field, ZERO)
+                aggregated[field] = mean + (data[field] - mean) / count
@@ -0,0 +1,130 @@
+"""Learn the report period and phase of plants from their report times."""
+
+from collections import deque
+from statistics import median
+
+# Number of report intervals used to estimate the period
+CADENCE_WINDOW = 8
+# Number of report intervals needed before the estimate is used
+CADENCE_MIN_SAMPLES = 2
+# Relative difference for intervals to count as the same interval
+CADENCE_TOLERANCE = 0.1
+
+
+class PlantCadence(object):
+    """The observed report cadence of a plant, the configured period is used until it is learned."""
+
+    def __init__(self, period):
+        self.period = float(period)
+        self.samples = deque(maxlen=CADENCE_WINDOW)
+        self.last_report = None
+        self.expected = None
+        # Metrics
+        self.reports = 0
+        self.early_polls = 0
+        self.predictions = 0
+        self.last_error = None
+        self.total_error = 0.0
+
+    def observe(self, report):
+        if self.last_report is not None and report - self.last_report < 1:
+            # Same or older report
+            return False
+        if self.expected is not None:
+            # Compare with the nearest expected report, reports can be missed
+            expected = (
+                self.expected
+                + round((report - self.expected) / self.period) * self.period
+            )
+            self.predictions += 1
+            self.last_error = report - expected
+            self.total_error += abs(self.last_error)
+        if self.last_report is not None:
+            self.samples.append(report - self.last_report)
+            self.period = self._estimate()
+        self.reports += 1
+        self.last_report = report
+        self.expected = report + self.period if self.ready else None
+        return True
+
+    def _estimate(self):
+        # Missed reports only make intervals longer, the smallest interval seen twice is the base period
+        ordered = sorted(self.samples)
+        base = ordered[0]
+        for interval, following in zip(ordered, ordered[1:]):
+            if following - interval <= CADENCE_TOLERANCE * interval:
+                base = interval
+                break
+        # Correct the intervals with missed reports
+        return median(
+            interval / max(1, round(interval / base)) for interval in self.samples
+        )
+
+    @property
+    def ready(self):
+        return len(self.samples) >= CADENCE_MIN_SAMPLES
+
+    def next_report(self, now, margin):
+        """Return the timestamp of the next expected report not passed by more than margin."""
+        if not self.ready:
+            return None
+        expected = self.last_report + self.period
+        if expected + margin < now:
+            # Reports were missed, keep the phase
+            expected += (int((now - margin - expected) / self.period) + 1) * self.period
+        return expected
+
+    def stats(self):
+        return {
+            "period": self.period,
+            "last_report": self.last_report,
+            "expected_report": self.expected,
+            "last_error": self.last_error,
+            "avg_error": (
+                self.total_error / self.predictions if self.predictions else None
+            ),
+            "reports": self.reports,
+            "early_polls": self.early_polls,
+        }
+
+
+class ReportCadence(object):
+    """Predict the next report of each plant, polls are aimed margin seconds after it."""
+
+    def __init__(self, period, margin):
+        self.period = period
+        self.margin = margin
+        self.plants = {}
+
+    def _plant(self, plant):
+        if plant not in self.plants:
+            self.plants[plant] = PlantCadence(self.period)
+        return self.plants[plant]
+
+    def observe(self, plant, report):
+        """Register the report timestamp of a new update. Returns the plant cadence."""
+        cadence = self._plant(plant)
+        cadence.observe(report)
+        return cadence
+
+    def early_poll(self, plant):
+        """Register a poll that did not return a new report."""
+        self._plant(plant).early_polls += 1
+
+    def next_poll(self, now):
+        """Return the timestamp of the next poll or None if no prediction is available yet."""
+        reports = [
+            report
+            for report in (
+                cadence.next_report(now, self.margin)
+                for cadence in self.plants.values()
+            )
+            if report is not None
+        ]
+        if not reports:
+            return None
+        return min(reports) + self.margin
+
+    def stats(self):
+        """Return the predicted and actual report metrics per plant."""
+        return {plant: cadence.stats() for plant, cadence in self.plants.items()}
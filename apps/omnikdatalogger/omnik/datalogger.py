@@ -1,26 +1,32 @@
 import os
 import sys
 import logging
-from typing import Any
 import pytz
 
 from omnik import LOGLEVEL
 from requests.exceptions import RequestException
 from omnik.ha_logger import hybridlogger
-from omnik.plant import Plant
+from omnik.plant import Plant, PlantState
 import requests
 import json
 from .daylight import daylight
 import threading
-from time import time, sleep
+from time import time, monotonic
 from decimal import Decimal
 from datetime import datetime, timedelta, timezone
 
 from .plugin_output import Plugin
 from .plugin_client import Client
 from .dsmr import DSRM
-from copy import deepcopy
-from cachetools import Cache
+from .dsmr.history import TelegramHistory
+from .dispatcher import OutputWorker, OVERFLOW_DROP_OLDEST, OVERFLOW_POLICIES
+from .cadence import ReportCadence
+from .aggregation import AggregatedData, AggregationPlan, AGGREGATE_OPERATORS
+from .scheduler import Scheduler
+from .records import DsmrSample
+from .persistant_cache import PersistantCache, JournalCache, PERSISTANT_CACHE_BACKENDS
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import importlib
 
@@ -28,6 +34,9 @@ import importlib
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a DSMR telegram in addition to the expected telegram interval
+DSMR_WAIT_TOLERANCE = 1.0
+
 
 class DataLogger(object):
     def __init__(self, config, hass_api=None):
@@ -38,16 +47,33 @@ class DataLogger(object):
         self.hass_api = hass_api
         self.logger = logger
         self.config = config
-        self.cache = Cache(maxsize=10)
+        # Runs the timed jobs (polls, cache flushes, DSMR flushes and heartbeats)
+        self.scheduler = Scheduler(self.logger, self.hass_api)
+        # Cached energy state per plant
+        self.plant_state = {}
         self.start_total_energy = {}
         self.every = self._get_interval()
         self.interval_aggregated = self._get_interval_aggregated()
+        # Concurrent fetching of plant data for timed clients
+        self.fetch_concurrency = max(
+            1, int(self.config.get("default", "fetch_concurrency", fallback=4))
+        )
+        self.fetch_timeout = int(
+            self.config.get("default", "fetch_timeout", fallback=60)
+        )
+        self._fetch_executor = None
+        # The last request per plant, a plant is not requested again while its request is running
+        self._fetch_requests = {}
+        # Maximum time to process queued output messages when terminating
+        self.output_drain_timeout = float(
+            self.config.get("default", "output_drain_timeout", fallback=30)
+        )
+        self.output_workers = {}
+        self.report_cadence = self._init_report_cadence()
         # Wait at least a polling interval before submitting net data without solar aggegation
         self.pasttime = time() + self.every
         tz = self.config.get("default", "timezone", fallback="Europe/Amsterdam")
         self.timezone = pytz.timezone(tz)
-        self.cached_data: dict[str, Any] = {}
-        self.aggegated_data: dict[str, Any] = {}
 
         self.dsmr_access = threading.Condition(threading.Lock())
 
@@ -63,6 +89,7 @@ class DataLogger(object):
         self.persistant_cache_file = self.config.get(
             "default", "persistant_cache_file", fallback="./persistant_cache.json"
         )
+        self._init_persistant_cache()
         self._load_persistant_cache()
         # read data_fields
         try:
@@ -80,6 +107,7 @@ class DataLogger(object):
         # read attributes
         if not self._read_attributes():
             sys.exit(1)
+        self._init_aggregation_plan()
 
         # Make sure we check for a recent update first
         self.last_update_time = datetime.now(timezone.utc) - timedelta(
@@ -105,8 +133,13 @@ class DataLogger(object):
 
         # Initialize client
         self._init_client()
+        if self.client.use_timer:
+            self._fetch_executor = ThreadPoolExecutor(
+                max_workers=self.fetch_concurrency, thread_name_prefix="omnik_fetch"
+            )
         # Initialize output plugins
         self._init_output_plugins()
+        self._init_output_workers()
 
         self.omnik_api_level = 0
 
@@ -281,13 +314,18 @@ class DataLogger(object):
         return True
 
     def terminate(self):
-        # Cleanup Client
-        self._terminate_client()
-        # Cleanup Output plugins
-        self._terminate_output_plugins()
-        # Terminate DSMR
+        # Stop the sources first, the poll job is stopped by RepeatedJob.stop() before
         if self.dsmr:
             self.dsmr.terminate()
+        if self._fetch_executor:
+            self._fetch_executor.shutdown(wait=False, cancel_futures=True)
+        self._terminate_client()
+        # Drain and cleanup the Output plugins
+        self._terminate_output_plugins()
+        # Write pending cache changes
+        self.persistant_cache.close()
+        # Stop the scheduled jobs
+        self.scheduler.stop(self.fetch_timeout)
 
     def _init_client(self):
         # For now the default client is not set by default, client should be configured in the config
@@ -352,6 +390,7 @@ class DataLogger(object):
             Plugin.logger = self.logger
             Plugin.config = self.config
             Plugin.hass_api = self.hass_api
+            Plugin.scheduler = self.scheduler
 
             for plugin in self.plugins:
                 try:
@@ -366,49 +405,160 @@ class DataLogger(object):
                         f"Output plugin {plugin} cannot be initialized!",
                     )
 
+    def _init_output_workers(self):
+        # Output plugins can process their messages from a queue in a separate thread
+        self.output_workers = {}
+        default_queue_size = int(
+            self.config.get("default", "output_queue_size", fallback="0")
+        )
+        default_overflow = self.config.get(
+            "default", "output_overflow", fallback=OVERFLOW_DROP_OLDEST
+        )
+        for plugin in Plugin.plugins:
+            section = f"output.{plugin.name}"
+            queue_size = int(
+                self.config.get(section, "queue_size", fallback=default_queue_size)
+            )
+            overflow = self.config.get(section, "overflow", fallback=default_overflow)
+            if not queue_size:
+                # Synchronous processing
+                continue
+            if overflow not in OVERFLOW_POLICIES:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "WARNING",
+                    f"Unknown overflow policy '{overflow}' for plugin '{plugin.name}', "
+                    f"using '{OVERFLOW_DROP_OLDEST}'.",
+                )
+                overflow = OVERFLOW_DROP_OLDEST
+            self.output_workers[plugin] = OutputWorker(
+                plugin, queue_size, overflow, self.logger, self.hass_api
+            )
+
+    def output_stats(self):
+        """Return the queue and latency metrics for the queued output plugins."""
+        return {
+            plugin.name: worker.stats()
+            for plugin, worker in self.output_workers.items()
+        }
+
+    def report_stats(self):
+        """Return the expected and actual report times per plant when adaptive_interval is enabled."""
+        return self.report_cadence.stats() if self.report_cadence else {}
+
+    def next_poll_time(self):
+        """Return the UTC time to poll for the next expected report or None if there is no prediction."""
+        if not self.report_cadence:
+            return None
+        next_poll = self.report_cadence.next_poll(time())
+        if next_poll is None:
+            return None
+        return datetime.fromtimestamp(next_poll, timezone.utc)
+
+    def _observe_report(self, plant, data):
+        if not self.report_cadence:
+            return
+        cadence = self.report_cadence.observe(plant, data["last_update"])
+        hybridlogger.ha_log(
+            self.logger,
+            self.hass_api,
+            "DEBUG",
+            f"Report cadence for plant {plant}: {cadence.stats()}",
+        )
+
+    def _terminate_output_workers(self):
+        # Process the remaining messages
+        for plugin, worker in self.output_workers.items():
+            worker.terminate(self.output_drain_timeout)
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "INFO",
+                f"Output queue statistics for plugin '{plugin.name}': {worker.stats()}",
+            )
+        self.output_workers = {}
+
+    def _dispatch(self, plugin, data):
+        if plugin in self.output_workers:
+            self.output_workers[plugin].put(data)
+        else:
+            plugin.process(msg=data)
+
     def _terminate_output_plugins(self):
+        self._terminate_output_workers()
         while Plugin.plugins:
             Plugin.plugins.pop(0).terminate()
 
     def _init_dsmr(self):
+        self.dsmr_data = {}
+        self.dsmr_plants = set()
+        # The number of DSMR messages kept per plant to match with the inverter data
+        self.dsmr_cache_depth = int(
+            self.config.get("dsmr", "cache_depth", fallback="10")
+        )
+        self.dsmr_interpolate = self.config.getboolean(
+            "dsmr", "interpolate", fallback=False
+        )
+        # Maximum time to wait for DSMR data, and the measured time waiting
+        self.dsmr_wait_timeout = float(
+            self.config.get("dsmr", "wait_timeout", fallback="20")
+        )
+        self.dsmr_wait_time = {"total": 0.0, "max": 0.0}
         terminals = self.config.getlist("dsmr", "terminals", fallback=[])
         if terminals and terminals[0]:
             self.dsmr = DSRM()
             self.dsmr.config = self.config
             self.dsmr.logger = self.logger
             self.dsmr.hass_api = self.hass_api
+            self.dsmr.scheduler = self.scheduler
             self.dsmr.datalogger = self
             self.dsmr.initialize(terminals=terminals, dsmr_callback=self.dsmr_callback)
+            # The plants that get DSMR data from a terminal
+            self.dsmr_plants = {
+                self.dsmr.tconfig[terminal]["plant_id"] or "0"
+                for terminal in self.dsmr.terminals
+            }
         else:
             self.dsmr = None
-        self.dsmr_data = {}
 
     def _get_dsmr_data(self, plant, data):
         # if dsmr measurements are not enabled then return
         if not self.dsmr:
             return
         # Try to merge with the latest dsmr data available
-        complete = False
-        tries = 20
         if "plant_id" not in data:
             data["plant_id"] = "0"
-        if plant not in self.dsmr_data:
+        if plant not in self.dsmr_plants:
             return False
-        while tries > 0:
-            self.dsmr_access.acquire()
-            if plant in self.dsmr_data:
+        start = time()
+        with self.dsmr_access:
+            timeout = self._dsmr_wait_timeout(plant)
+            if timeout:
+                # Wait until dsmr_callback signals a telegram newer than the latest telegram now
+                history = self.dsmr_data.get(plant)
+                last_timestamp = history.last_timestamp if history else None
+                self.dsmr_access.wait_for(
+                    lambda: self._dsmr_received(plant, last_timestamp),
+                    timeout=timeout,
+                )
+            # Use the best DSMR data available, also when no newer data arrived in time
+            complete = plant in self.dsmr_data
+            if complete:
                 # Insert raw DSMR data
                 data.update(self._dsmr_cache(plant, data["last_update"]))
                 # Insert calculated netto values (solar - net)
                 self._calculate_consumption(data)
-                complete = True
-            self.dsmr_access.release()
-            tries -= 1
-            if not complete:
-                sleep(1)
-            else:
-                break
-        if not tries:
+        waited = time() - start
+        self.dsmr_wait_time["total"] += waited
+        self.dsmr_wait_time["max"] = max(self.dsmr_wait_time["max"], waited)
+        hybridlogger.ha_log(
+            self.logger,
+            self.hass_api,
+            "DEBUG",
+            f"Waited {waited:.3f} seconds for DSMR data for plant {plant}.",
+        )
+        if not complete:
             hybridlogger.ha_log(
                 self.logger,
                 self.hass_api,
@@ -458,9 +608,12 @@ class DataLogger(object):
             plant_id = dsmr_message.pop("plant_id")
         else:
             plant_id = "0"
-        self.dsmr_access.acquire()
-        self._dsmr_cache_update(plant_id, dsmr_message)
-        self.dsmr_access.release()
+        # The message is shared from here on, keep it as a compact read only record
+        dsmr_message = DsmrSample(dsmr_message)
+        with self.dsmr_access:
+            self._dsmr_cache_update(plant_id, dsmr_message)
+            # Wake up threads waiting for DSMR data
+            self.dsmr_access.notify_all()
         if plant_id in self.plant_update:
             # DSMR for specific plant
             self._proces_pushed_net_event(plant_id, dsmr_message)
@@ -468,23 +621,35 @@ class DataLogger(object):
             # Aggregated DSMR only
             self._proces_pushed_net_event("0", dsmr_message)
 
+    def _dsmr_wait_timeout(self, plant_id):
+        # No wait when the terminal is disconnected or only sends coalesced telegrams
+        if not self.dsmr.connected(plant_id) or self.dsmr.coalescing(plant_id):
+            return 0
+        if plant_id not in self.dsmr_data:
+            # Wait for the first telegram
+            return self.dsmr_wait_timeout
+        return min(
+            self.dsmr_wait_timeout,
+            self.dsmr.telegram_interval(plant_id) + DSMR_WAIT_TOLERANCE,
+        )
+
+    def _dsmr_received(self, plant_id, timestamp):
+        # True when a telegram after timestamp (meter time) was received for the plant
+        history = self.dsmr_data.get(plant_id)
+        return history is not None and (
+            timestamp is None or history.last_timestamp > timestamp
+        )
+
     def _dsmr_cache_update(self, plant_id, dsmr_message):
         if plant_id not in self.dsmr_data:
-            self.dsmr_data[plant_id] = list()
-        if len(self.dsmr_data[plant_id]) == 10:
-            self.dsmr_data[plant_id].pop(0)
+            self.dsmr_data[plant_id] = TelegramHistory(self.dsmr_cache_depth)
         self.dsmr_data[plant_id].append(dsmr_message)
 
     def _dsmr_cache(self, plant_id, timestamp):
-        max_delta = -1
-        best_data = None
-        for data in reversed(self.dsmr_data[plant_id]):
-            dsmr_ts = data["timestamp"]
-            delta = abs(timestamp - dsmr_ts)
-            if delta < max_delta or max_delta < 0:
-                max_delta = delta
-                best_data = data
-        return best_data
+        # Get the DSMR data that matches the timestamp best
+        if self.dsmr_interpolate:
+            return self.dsmr_data[plant_id].interpolate(timestamp)
+        return self.dsmr_data[plant_id].nearest(timestamp)
 
     def _get_interval(self):
         if self.config.has_option("default", "interval"):
@@ -492,6 +657,15 @@ class DataLogger(object):
         else:
             return 0
 
+    def _init_report_cadence(self):
+        # Learn the report cadence of the plants to aim the polls just after a new report
+        if not self.config.getboolean("default", "adaptive_interval", fallback=False):
+            return None
+        return ReportCadence(
+            self.every or self.interval_aggregated,
+            float(self.config.get("default", "adaptive_margin", fallback=10)),
+        )
+
     def _get_interval_aggregated(self):
         if self.config.has_option("default", "interval_aggregated"):
             return int(self.config.get("default", "interval_aggregated"))
@@ -593,9 +767,49 @@ class DataLogger(object):
             if self.sundown:
                 data["current_power"] = Decimal("0")
 
-    def _fetch_update(self, plant):
+    def _fetch_plant_updates(self):
+        # Request the data for all plants concurrently, the number of parallel requests is limited by fetch_concurrency
+        # The requests start in rounds of fetch_concurrency plants, every plant gets fetch_timeout seconds from its round
+        start = monotonic()
+        for plant in self.plant_update:
+            request = self._fetch_requests.get(plant)
+            if request and not request.done():
+                # A running request can not be cancelled, wait for it instead of requesting the plant again
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "DEBUG",
+                    f"The previous request for plant {plant} is still running.",
+                )
+                continue
+            self._fetch_requests[plant] = self.client.submitPlantData(
+                self._fetch_executor, plant
+            )
+        fetched = {}
+        for position, plant in enumerate(self.plant_update):
+            request = self._fetch_requests[plant]
+            deadline = start + self.fetch_timeout * (
+                position // self.fetch_concurrency + 1
+            )
+            done, _ = wait([request], timeout=max(deadline - monotonic(), 0))
+            if done:
+                fetched[plant] = request
+                continue
+            # Only a request that has not started yet is cancelled
+            request.cancel()
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "WARNING",
+                f"No response for plant {plant} within {self.fetch_timeout} seconds, "
+                "the update of this plant is skipped.",
+            )
+        return fetched
+
+    def _fetch_update(self, plant, request):
         try:
-            data = self.client.getPlantData(plant)
+            # Get the result of the request, exceptions raised by the client are raised here
+            data = request.result()
             if data:
                 self._sundown_reset_power(data)
                 # Get the actual report time from the omnik portal
@@ -624,7 +838,10 @@ class DataLogger(object):
                         plant
                     ].last_update_time = newreporttime.astimezone(timezone.utc)
                     data["plant_id"] = plant
+                    self._observe_report(plant, data)
                     return data
+                if self.report_cadence:
+                    self.report_cadence.early_poll(plant)
                 hybridlogger.ha_log(
                     self.logger,
                     self.hass_api,
@@ -688,7 +905,7 @@ class DataLogger(object):
                     "DEBUG",
                     f"Trigger plugin '{getattr(plugin, 'name')}'.",
                 )
-                plugin.process(msg=data)
+                self._dispatch(plugin, data)
 
     def _output_update_aggregated_data(self, plant, data):
         # Insert dummy data for fields that have not been supplied by the client
@@ -702,106 +919,19 @@ class DataLogger(object):
                     "DEBUG",
                     f"Trigger plugin '{getattr(plugin, 'name')}' with aggregated data.",
                 )
-                plugin.process(msg=data)
-
-    def _init_aggregated_data(self, aggregated_data, data, sys_id):
-        if not aggregated_data:
-            # Initialize
-            aggregated_data["sys_id"] = sys_id
-            for field in [
-                "last_update",
-                "current_power",
-                "today_energy",
-                "total_energy",
-                "current_ac1",
-                "current_ac2",
-                "current_ac3",
-                "voltage_ac1",
-                "voltage_ac2",
-                "voltage_ac3",
-                "voltage_ac_max",
-                "inverter_temperature",
-            ]:
-                self._init_aggregated_data_field(aggregated_data, data, field)
-            if data.get("cached"):
-                aggregated_data["cached"] = True
-            if self.dsmr:
-                for field in [
-                    # Attributes Electricity for pvoutput
-                    "power_consumption",
-                    "energy_used",
-                    "energy_used_net",
-                    "net_voltage_max",
-                    "INSTANTANEOUS_VOLTAGE_L1",
-                    "INSTANTANEOUS_VOLTAGE_L2",
-                    "INSTANTANEOUS_VOLTAGE_L3",
-                    # Other attributes Electricity for mqtt or influxdb
-                    "timestamp",
-                    "ELECTRICITY_USED_TARIFF_1",
-                    "ELECTRICITY_USED_TARIFF_2",
-                    "ELECTRICITY_DELIVERED_TARIFF_1",
-                    "ELECTRICITY_DELIVERED_TARIFF_2",
-                    "energy_delivered_net",
-                    "CURRENT_ELECTRICITY_USAGE",
-                    "CURRENT_ELECTRICITY_DELIVERY",
-                    "ELECTRICITY_ACTIVE_TARIFF",
-                    "LONG_POWER_FAILURE_COUNT",
-                    "SHORT_POWER_FAILURE_COUNT",
-                    "VOLTAGE_SAG_L1_COUNT",
-                    "VOLTAGE_SAG_L2_COUNT",
-                    "VOLTAGE_SAG_L3_COUNT",
-                    "VOLTAGE_SWELL_L1_COUNT",
-                    "VOLTAGE_SWELL_L2_COUNT",
-                    "VOLTAGE_SWELL_L3_COUNT",
-                    "INSTANTANEOUS_ACTIVE_POWER_L1_POSITIVE",
-                    "INSTANTANEOUS_ACTIVE_POWER_L1_NEGATIVE",
-                    "INSTANTANEOUS_ACTIVE_POWER_L2_POSITIVE",
-                    "INSTANTANEOUS_ACTIVE_POWER_L2_NEGATIVE",
-                    "INSTANTANEOUS_ACTIVE_POWER_L3_POSITIVE",
-                    "INSTANTANEOUS_ACTIVE_POWER_L3_NEGATIVE",
-                    "current_net_power",
-                    "current_net_power_l1",
-                    "current_net_power_l2",
-                    "current_net_power_l3",
-                    "net_voltage_max",
-                    "INSTANTANEOUS_CURRENT_L1",
-                    "INSTANTANEOUS_CURRENT_L2",
-                    "INSTANTANEOUS_CURRENT_L3",
-                    "net_current_l1",
-                    "net_current_l2",
-                    "net_current_l3",
-                    # Other attributes Gas
-                    "timestamp_gas",
-                    "gas_consumption_total",
-                    "gas_consumption_hour",
-                ]:
-                    self._init_aggregated_data_field(aggregated_data, data, field)
-                # Other attributes Electricity
-                # Other attributes Gas
-                {
-                    "timestamp_gas": 1622714706.0,
-                    "gas_consumption_total": 2864.6,
-                    "gas_consumption_hour": 0,
-                }
-
-    def _init_aggregated_data_field(self, aggregated_data, data, field):
-        if field in data and field not in aggregated_data:
-            aggregated_data[field] = Decimal("0")
-
-    def _adapt_max_value(self, aggregated_data, data, field):
-        if field in data:
-            if data[field] > aggregated_data.get(field, Decimal("0.0")):
-                aggregated_data[field] = data[field]
-
-    def _adapt_add_value(self, aggregated_data, data, field):
-        if field in data:
-            aggregated_data[field] = (
-                aggregated_data.get(field, Decimal("0.0")) + data[field]
-            )
+                self._dispatch(plugin, data)
 
-    def _adapt_last_value(self, aggregated_data, data, field):
-        if field in data:
-            aggregated_data[field] = data[field]
+    def _init_aggregation_plan(self):
+        # Compile the aggregate operators of the fields in data_fields.json
+        self.aggregation_plan = AggregationPlan(self.config.data_field_config)
+        for field, operator in self.aggregation_plan.invalid.items():
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "WARNING",
+                f"Unknown aggregate operator '{operator}' for field '{field}', "
+                f"valid operators are {AGGREGATE_OPERATORS}.",
+            )
 
     def _aggregate_data(self, aggregated_data, data):
         if not data:
@@ -815,107 +945,13 @@ class DataLogger(object):
             # Do no aggegate: add sys_id to data set
             data["sys_id"] = sys_id
         else:
-            # Get sys_id from pvoutput section, cannot aggregate without sys_id
-            sys_id = global_sys_id
-            # Aggerate data (initialize dict and set sys_id)
-            self._init_aggregated_data(aggregated_data, data, sys_id)
-            # Timestamp
-            self._adapt_max_value(aggregated_data, data, "last_update")
-            # Add energy
-            self._adapt_add_value(aggregated_data, data, "today_energy")
-            self._adapt_add_value(aggregated_data, data, "total_energy")
-            # Add power
-            self._adapt_add_value(aggregated_data, data, "current_power")
-            # Max voltage
-            self._adapt_max_value(aggregated_data, data, "voltage_ac_max")
-            self._adapt_max_value(aggregated_data, data, "voltage_ac1")
-            self._adapt_max_value(aggregated_data, data, "voltage_ac2")
-            self._adapt_max_value(aggregated_data, data, "voltage_ac3")
-            self._adapt_max_value(aggregated_data, data, "net_voltage_max")
-            # Max current
-            self._adapt_max_value(aggregated_data, data, "current_ac1")
-            self._adapt_max_value(aggregated_data, data, "current_ac2")
-            self._adapt_max_value(aggregated_data, data, "current_ac3")
-            # Max inverter temperature
-            self._adapt_max_value(aggregated_data, data, "inverter_temperature")
-            if self.dsmr:
-                self._adapt_add_value(aggregated_data, data, "power_consumption")
-                self._adapt_add_value(aggregated_data, data, "energy_used_net")
-                self._adapt_add_value(aggregated_data, data, "energy_used")
-                # DSMR specific data for output to mqtt or influx with multiple meters or inverters
-                self._adapt_max_value(aggregated_data, data, "INSTANTANEOUS_VOLTAGE_L1")
-                self._adapt_max_value(aggregated_data, data, "INSTANTANEOUS_VOLTAGE_L2")
-                self._adapt_max_value(aggregated_data, data, "INSTANTANEOUS_VOLTAGE_L3")
-                # Other attributes Electricity for mqtt or influxdb
-                self._adapt_last_value(aggregated_data, data, "timestamp")
-                self._adapt_last_value(
-                    aggregated_data, data, "ELECTRICITY_USED_TARIFF_1"
-                )
-                self._adapt_last_value(
-                    aggregated_data, data, "ELECTRICITY_USED_TARIFF_2"
-                )
-                self._adapt_last_value(
-                    aggregated_data, data, "ELECTRICITY_DELIVERED_TARIFF_1"
-                )
-                self._adapt_last_value(
-                    aggregated_data, data, "ELECTRICITY_DELIVERED_TARIFF_2"
-                )
-                self._adapt_last_value(
-                    aggregated_data, data, "ELECTRICITY_ACTIVE_TARIFF"
-                )
-
-                self._adapt_add_value(aggregated_data, data, "energy_delivered_net")
-                self._adapt_add_value(
-                    aggregated_data, data, "CURRENT_ELECTRICITY_USAGE"
-                )
-                self._adapt_add_value(
-                    aggregated_data, data, "CURRENT_ELECTRICITY_DELIVERY"
-                )
-                self._adapt_add_value(aggregated_data, data, "LONG_POWER_FAILURE_COUNT")
-                self._adapt_add_value(
-                    aggregated_data, data, "SHORT_POWER_FAILURE_COUNT"
-                )
-                self._adapt_add_value(aggregated_data, data, "VOLTAGE_SAG_L1_COUNT")
-                self._adapt_add_value(aggregated_data, data, "VOLTAGE_SAG_L2_COUNT")
-                self._adapt_add_value(aggregated_data, data, "VOLTAGE_SAG_L3_COUNT")
-                self._adapt_add_value(aggregated_data, data, "VOLTAGE_SWELL_L1_COUNT")
-                self._adapt_add_value(aggregated_data, data, "VOLTAGE_SWELL_L2_COUNT")
-                self._adapt_add_value(aggregated_data, data, "VOLTAGE_SWELL_L3_COUNT")
-
-                self._adapt_add_value(
-                    aggregated_data, data, "INSTANTANEOUS_ACTIVE_POWER_L1_POSITIVE"
-                )
-                self._adapt_add_value(
-                    aggregated_data, data, "INSTANTANEOUS_ACTIVE_POWER_L2_POSITIVE"
-                )
-                self._adapt_add_value(
-                    aggregated_data, data, "INSTANTANEOUS_ACTIVE_POWER_L3_POSITIVE"
-                )
-                self._adapt_add_value(
-                    aggregated_data, data, "INSTANTANEOUS_ACTIVE_POWER_L1_NEGATIVE"
-                )
-                self._adapt_add_value(
-                    aggregated_data, data, "INSTANTANEOUS_ACTIVE_POWER_L2_NEGATIVE"
-                )
-                self._adapt_add_value(
-                    aggregated_data, data, "INSTANTANEOUS_ACTIVE_POWER_L3_NEGATIVE"
-                )
-
-                self._adapt_add_value(aggregated_data, data, "current_net_power")
-                self._adapt_add_value(aggregated_data, data, "current_net_power_l1")
-                self._adapt_add_value(aggregated_data, data, "current_net_power_l2")
-                self._adapt_add_value(aggregated_data, data, "current_net_power_l3")
-                self._adapt_add_value(aggregated_data, data, "INSTANTANEOUS_CURRENT_L1")
-                self._adapt_add_value(aggregated_data, data, "INSTANTANEOUS_CURRENT_L2")
-                self._adapt_add_value(aggregated_data, data, "INSTANTANEOUS_CURRENT_L3")
-                self._adapt_add_value(aggregated_data, data, "net_current_l1")
-                self._adapt_add_value(aggregated_data, data, "net_current_l2")
-                self._adapt_add_value(aggregated_data, data, "net_current_l3")
-                # Other attributes Gas
-                self._adapt_last_value(aggregated_data, data, "timestamp_gas")
-
-                self._adapt_add_value(aggregated_data, data, "gas_consumption_total")
-                self._adapt_add_value(aggregated_data, data, "gas_consumption_hour")
+            if not aggregated_data:
+                # Get sys_id from pvoutput section, cannot aggregate without sys_id
+                aggregated_data["sys_id"] = global_sys_id
+                if data.get("cached"):
+                    aggregated_data["cached"] = True
+            # Aggregate the fields as configured in data_fields.json
+            self.aggregation_plan.add(aggregated_data, data)
 
     def _digitize_and_cache(self, data):
         digitize_fields = [
@@ -966,15 +1002,46 @@ class DataLogger(object):
         )
         data["total_energy"] = data.pop("total_energy_recalc")
 
+    def _init_persistant_cache(self):
+        backend = self.config.get("default", "persistant_cache_backend", "json")
+        if backend not in PERSISTANT_CACHE_BACKENDS:
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "WARNING",
+                f"Unknown persistant cache backend '{backend}', using 'json'.",
+            )
+            backend = "json"
+        # Changes are written at most every persistant_cache_flush_interval seconds
+        flush_interval = int(
+            self.config.get("default", "persistant_cache_flush_interval", "60")
+        )
+        if backend == "journal":
+            self.persistant_cache = JournalCache(
+                self.persistant_cache_file,
+                flush_interval,
+                self.logger,
+                self.hass_api,
+                self.scheduler,
+                journal_size=int(
+                    self.config.get("default", "persistant_cache_journal_size", "1000")
+                ),
+            )
+        else:
+            self.persistant_cache = PersistantCache(
+                self.persistant_cache_file,
+                flush_interval,
+                self.logger,
+                self.hass_api,
+                self.scheduler,
+            )
+
     def _load_persistant_cache(self):
         try:
-            with open(self.persistant_cache_file) as total_energy_cache:
-                file_cache = json.load(total_energy_cache)
-                for item in file_cache:
-                    try:
-                        self.cache[item] = Decimal(f"{file_cache[item]}")
-                    except:
-                        self.cache[item] = file_cache[item]
+            for item, value in self.persistant_cache.load().items():
+                plant, _, field = item.rpartition(".")
+                if field in PlantState.__slots__:
+                    setattr(self._plant_state(plant), field, value)
             hybridlogger.ha_log(
                 self.logger,
                 self.hass_api,
@@ -989,29 +1056,21 @@ class DataLogger(object):
                 f"Cache file '{self.persistant_cache_file}' was not used previously. Error: {e.args}",
             )
 
-    def _update_persistant_cache(self):
-        try:
-            file_cache = {}
-            for item in self.cache:
-                if type(self.cache[item]) == Decimal:
-                    file_cache[item] = float(self.cache[item])
-                else:
-                    file_cache[item] = self.cache[item]
-            with open(self.persistant_cache_file, "w") as json_file_config:
-                json.dump(file_cache, json_file_config)
-        except Exception as e:
-            hybridlogger.ha_log(
-                self.logger,
-                self.hass_api,
-                "ERROR",
-                f"Cache file '{self.persistant_cache_file}' can not be written! Error: {e.args}",
-            )
+    def _plant_state(self, plant):
+        if plant not in self.plant_state:
+            self.plant_state[plant] = PlantState()
+        return self.plant_state[plant]
+
+    def _update_persistant_cache(self, plant, fields):
+        # Mark the changed fields, the cache file is written by the next flush
+        self.persistant_cache.update(self.plant_state[plant].items(plant, fields))
 
     def get_last_update(self, plant, default=time()):
-        last_update_key = f"{plant}.last_update"
-        cache = self.cache.get(last_update_key)
-        if cache:
-            return datetime.timestamp(datetime.strptime(cache, "%Y-%m-%dT%H:%M:%S"))
+        state = self.plant_state.get(plant)
+        if state and state.last_update:
+            return datetime.timestamp(
+                datetime.strptime(state.last_update, "%Y-%m-%dT%H:%M:%S")
+            )
         return default
 
     def total_energy(
@@ -1023,12 +1082,7 @@ class DataLogger(object):
         last_update=None,
         lifetime=True,
     ):
-        # start_total_energy_key = f'{plant}.start_total_energy'
-        last_total_energy = f"{plant}.last_total_energy"
-        last_today_energy = f"{plant}.last_today_energy"
-        last_current_power = f"{plant}.last_current_power"
-        last_reset = f"{plant}.last_reset"
-        last_update_key = f"{plant}.last_update"
+        state = self._plant_state(plant)
         last_reset_payload = str(
             datetime.now(self.timezone)
             .replace(
@@ -1041,26 +1095,28 @@ class DataLogger(object):
         )
         # if total energy is supplied, update cache directly
         if total_energy:
-            self.cache[last_total_energy] = total_energy
-            self.cache[last_today_energy] = today_energy
-            self.cache[last_current_power] = current_power
-            self.cache[last_reset] = last_reset_payload
-            self.cache[last_update_key] = str(
+            state.last_total_energy = total_energy
+            state.last_today_energy = today_energy
+            state.last_current_power = current_power
+            state.last_reset = last_reset_payload
+            state.last_update = str(
                 datetime.fromtimestamp(last_update).replace(microsecond=0).isoformat()
             )
-            self._update_persistant_cache()
-        elif not self.cache.get(last_reset) or datetime.fromisoformat(
+            self._update_persistant_cache(plant, PlantState.__slots__)
+        elif not state.last_reset or datetime.fromisoformat(
             last_reset_payload
-        ) > datetime.fromisoformat(self.cache.get(last_reset)):
+        ) > datetime.fromisoformat(state.last_reset):
             # reset daily counters and last_reset
-            self.cache[last_today_energy] = Decimal("0.0")
-            self.cache[last_current_power] = Decimal("0.0")
-            self.cache[last_reset] = str(last_reset_payload)
-            if self.cache.get(last_total_energy):
+            state.last_today_energy = Decimal("0.0")
+            state.last_current_power = Decimal("0.0")
+            state.last_reset = str(last_reset_payload)
+            if state.last_total_energy:
                 # reset initial energy in memory since today_energy is reset
-                self.start_total_energy[plant] = self.cache.get(last_total_energy)
-            self._update_persistant_cache()
-            return self.cache[last_today_energy]
+                self.start_total_energy[plant] = state.last_total_energy
+            self._update_persistant_cache(
+                plant, ["last_today_energy", "last_current_power", "last_reset"]
+            )
+            return state.last_today_energy
 
         if plant not in self.start_total_energy:
             if total_energy:
@@ -1072,14 +1128,17 @@ class DataLogger(object):
                 )
             else:
                 # No accurate total energy is available, use total_energy cache
-                if last_today_energy in self.cache and last_total_energy in self.cache:
+                if (
+                    state.last_today_energy is not None
+                    and state.last_total_energy is not None
+                ):
                     self.start_total_energy[plant] = (
-                        self.cache[last_total_energy] - self.cache[last_today_energy]
+                        state.last_total_energy - state.last_today_energy
                     )
                     return (
-                        self.start_total_energy[plant] + self.cache[last_today_energy]
+                        self.start_total_energy[plant] + state.last_today_energy
                         if lifetime
-                        else self.cache[last_today_energy]
+                        else state.last_today_energy
                     )
                 else:
                     return None
@@ -1090,11 +1149,14 @@ class DataLogger(object):
             elif today_energy:
                 return self.start_total_energy[plant] + today_energy
             else:
-                if last_today_energy in self.cache and last_total_energy in self.cache:
+                if (
+                    state.last_today_energy is not None
+                    and state.last_total_energy is not None
+                ):
                     return (
-                        self.start_total_energy[plant] + self.cache[last_today_energy]
+                        self.start_total_energy[plant] + state.last_today_energy
                         if lifetime
-                        else self.cache[last_today_energy]
+                        else state.last_today_energy
                     )
                 else:
                     return None
@@ -1103,6 +1165,7 @@ class DataLogger(object):
         time_now = self.dl.localtime()
         self.sundown = self.dl.sun_down(time_now)
         if self.sundown:
+            next_dawn = self.dl.next_dawn
             hybridlogger.ha_log(
                 self.logger,
                 self.hass_api,
@@ -1113,54 +1176,49 @@ class DataLogger(object):
                 self.logger,
                 self.hass_api,
                 "INFO",
-                f"No sunshine postponing inverter checks till down next dawn {self.dl.next_dawn}.",
+                f"No sunshine postponing inverter checks till down next dawn {next_dawn}.",
             )
             # Send 0 Watt update
-            return self.dl.next_dawn + timedelta(minutes=10)
+            return next_dawn + timedelta(minutes=10)
         else:
             # return the last report time return value, but not when there is no sun
             return self.last_update_time
 
-    def _proces_pushed_net_event(self, plant_id, dsmr_message):
+    def _cached_plant_data(self, plant):
+        # The cached energy data of a plant
+        return {
+            "plant_id": plant,
+            "last_update": self.get_last_update(plant, 0.0),
+            "total_energy": self.total_energy(plant),
+            "today_energy": self.total_energy(plant, lifetime=False),
+            # Assume we have no solar power currently
+            "current_power": Decimal("0.0"),
+        }
 
-        data: dict[str, Any] = deepcopy(dsmr_message)
-        data["plant_id"] = plant_id
+    def _proces_pushed_net_event(self, plant_id, dsmr_message):
+        # The DSMR message is shared with the DSMR history and is not changed,
+        # the values added here are kept in an overlay
+        data = ChainMap({"plant_id": plant_id}, dsmr_message)
         self._validate_client_data(plant_id, data)
         dsmr_timestamp = data["timestamp"]
         last_solar_update = 0.0
         if dsmr_timestamp > self.pasttime:
             # Process independent net data for aggregated clients with regards of rate limits
-            # Get last data from cache
-            self.aggegated_data.clear()
+            # Get last data from cache, the scratch dicts are local to this DSMR thread
+            aggregated_data = AggregatedData()
+            cached_data = None
             if plant_id == "0":
                 for plant in self.plant_update.keys():
                     if not self.total_energy(plant):
                         continue
-                    self.cached_data.clear()
-                    self.cached_data["plant_id"] = plant
-                    self.cached_data["last_update"] = self.get_last_update(plant, 0.0)
-                    self.cached_data["total_energy"] = self.total_energy(plant)
-                    self.cached_data["today_energy"] = self.total_energy(
-                        plant, lifetime=False
-                    )
-                    # Assume we have no solar power currently
-                    self.cached_data["current_power"] = Decimal("0.0")
-                    self._aggregate_data(self.aggegated_data, self.cached_data)
+                    cached_data = self._cached_plant_data(plant)
+                    self._aggregate_data(aggregated_data, cached_data)
                     cached_last_update = self.get_last_update(plant, 0.0)
                     if cached_last_update > last_solar_update:
                         last_solar_update = cached_last_update
-                self.aggegated_data.update(data)
             elif self.total_energy(plant_id):
-                self.cached_data.clear()
-                self.cached_data["plant_id"] = plant_id
-                self.cached_data["last_update"] = self.get_last_update(plant_id, 0.0)
-                self.cached_data["total_energy"] = self.total_energy(plant_id)
-                self.cached_data["today_energy"] = self.total_energy(
-                    plant_id, lifetime=False
-                )
-                # Assume we have no solar power currently
-                self.cached_data["current_power"] = Decimal("0.0")
-                self._aggregate_data(self.aggegated_data, self.cached_data)
+                cached_data = self._cached_plant_data(plant_id)
+                self._aggregate_data(aggregated_data, cached_data)
                 cached_last_update = self.get_last_update(plant_id, 0.0)
                 if cached_last_update > last_solar_update:
                     last_solar_update = cached_last_update
@@ -1186,11 +1244,15 @@ class DataLogger(object):
                     self.plant_update[plant_id].last_update_time
                 )
             # we will send (net) updates when inverters do not retreive new updates
-            if (dsmr_timestamp - last_update) > self.every and self.cached_data:
-                if self.aggegated_data:
-                    data.update(self.aggegated_data)
-                elif self.cached_data:
-                    data.update(self.cached_data)
+            if (dsmr_timestamp - last_update) > self.every and cached_data:
+                # A plant with its own sys_id is not aggregated, its cached data is used then
+                cached = (
+                    aggregated_data
+                    if plant_id == "0"
+                    else aggregated_data or cached_data
+                )
+                if cached:
+                    data.maps.insert(1, cached)
                 data["net_update"] = True
                 # calculate energy_use
                 self._calculate_consumption(data)
@@ -1225,11 +1287,18 @@ class DataLogger(object):
 
         # Process data reports for each plant
         if self.omnik_api_level == 2:
-            self.aggegated_data.clear()
+            aggregated_data = AggregatedData()
             skip_aggregation = False
+            # Fetch the updates for all plants in parallel
+            fetched = self._fetch_plant_updates()
+            # Process the results in the order of the plant list
             for plant in self.plant_update:
-                # Try getting a new update or wait for logging event
-                data = self._fetch_update(plant)
+                # Validate the new update (if received in time)
+                data = (
+                    self._fetch_update(plant, fetched[plant])
+                    if plant in fetched
+                    else None
+                )
                 if data:
                     # A new last update time was set
                     if self.plant_update[plant].last_update_time > next_report_at:
@@ -1239,7 +1308,7 @@ class DataLogger(object):
                     # Get specific dsmr data
                     self._get_dsmr_data(plant, data)
                     # Assemble aggegated data
-                    self._aggregate_data(self.aggegated_data, data)
+                    self._aggregate_data(aggregated_data, data)
                     # export the data to the output plugins
                     self._output_update(plant, data)
                 else:
@@ -1252,19 +1321,19 @@ class DataLogger(object):
                         data["total_energy"] = self.total_energy(plant)
                         data["today_energy"] = self.total_energy(plant, lifetime=False)
                         # Assemble aggegated data
-                        self._aggregate_data(self.aggegated_data, data)
+                        self._aggregate_data(aggregated_data, data)
                     except:
                         # do not allow data aggregation unless we have valid data
                         skip_aggregation = True
 
             # Process aggregated data over all plants if no specific plants are configured with DSMR terminal
-            if self.aggegated_data and not skip_aggregation:
+            if aggregated_data and not skip_aggregation:
                 # Output aggregated data to influx/mqtt if we have multiple plants
                 if len(self.client.plant_id_list) > 1 or self._get_dsmr_data(
-                    "0", self.aggegated_data
+                    "0", aggregated_data
                 ):
-                    self._output_update("0", self.aggegated_data)
-                self._output_update_aggregated_data(plant, self.aggegated_data)
+                    self._output_update("0", aggregated_data)
+                self._output_update_aggregated_data(plant, aggregated_data)
                 hybridlogger.ha_log(
                     self.logger, self.hass_api, "DEBUG", "Aggregated data processed."
                 )
@@ -1315,26 +1384,28 @@ class DataLogger(object):
 
         # To aggregate over multiple inverters we need to trigger publishing when we an update for all our inverters
         # Unless the last data update of an inverter is longer then 2 timed cycles
-        self.aggegated_data.clear()
+        aggregated_data = AggregatedData()
         for published_plant in self.plant_update:
-            if self.plant_update[published_plant].pop_for_aggregate(self.cache):
+            if self.plant_update[published_plant].pop_for_aggregate(
+                self.plant_state.get(published_plant)
+            ):
                 # Assemble aggegated data
                 self._aggregate_data(
-                    self.aggegated_data, self.plant_update[published_plant].data
+                    aggregated_data, self.plant_update[published_plant].data
                 )
             else:
                 # Not ready yet to aggregate, erase cache
-                self.aggegated_data.clear()
+                aggregated_data.clear()
                 break
         # only publish unpublished fresh data (<10 minutes old)
-        if self.aggegated_data:
+        if aggregated_data:
             # Get dsmr data for aggegated data
             # Output aggregated data to influx/mqtt if we have multiple plants
             if len(self.client.plant_id_list) > 1 or self._get_dsmr_data(
-                "0", self.aggegated_data
+                "0", aggregated_data
             ):
-                self._output_update("0", self.aggegated_data)
-            self._output_update_aggregated_data("0", self.aggegated_data)
+                self._output_update("0", aggregated_data)
+            self._output_update_aggregated_data("0", aggregated_data)
             #
             hybridlogger.ha_log(
                 self.logger, self.hass_api, "DEBUG", "Aggregated data processed"
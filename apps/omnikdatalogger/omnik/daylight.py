@@ -16,6 +16,9 @@ global default_city_name
 
 default_city_name = "Amsterdam"
 
+# Number of dates for which the solar schedule is kept
+SCHEDULE_CACHE_SIZE = 4
+
 
 class daylight(object):
     def __init__(self, city_name=default_city_name):
@@ -27,14 +30,39 @@ class daylight(object):
             self._city = self._a[city_name]
 
         self._timezone = pytz.timezone(self._city.timezone)
+        # Solar schedules by local date
+        self._schedules = {}
+
+    def _calculate(self, date):
+        if VERSION == 2:
+            return sun.sun(self._city.observer, date, tzinfo=self._city.timezone)
+        else:
+            return self._city.sun(date)
+
+    def schedule(self, date):
+        """Return the solar schedule (dawn, sunrise, noon, sunset, dusk) for a local date."""
+        if date not in self._schedules:
+            if len(self._schedules) >= SCHEDULE_CACHE_SIZE:
+                # Remove the schedule that was calculated first
+                del self._schedules[next(iter(self._schedules))]
+            self._schedules[date] = self._calculate(date)
+        return self._schedules[date]
+
+    def schedules(self, start, end):
+        """Return the solar schedules for the local dates from start up to and including end."""
+        return {
+            date: self._schedules.get(date) or self._calculate(date)
+            for date in (
+                start + timedelta(days=day) for day in range((end - start).days + 1)
+            )
+        }
 
     def sun(self, t=None):
         if not t:
             t = self.localtime()
-        if VERSION == 2:
-            return sun.sun(self._city.observer, t, tzinfo=self._city.timezone)
-        else:
-            return self._city.sun(t)
+        elif t.tzinfo:
+            t = t.astimezone(self._timezone)
+        return self.schedule(t.date())
 
     def localtime(self):
         return datetime.now(self._timezone)
@@ -49,9 +77,10 @@ class daylight(object):
 
     @property
     def next_dawn(self):
-        _sundawn = self.dawn
-        if _sundawn < self.localtime():
-            _sundawn = self.sun(self.localtime() + timedelta(days=1))["dawn"]
+        now = self.localtime()
+        _sundawn = self.sun(now)["dawn"]
+        if _sundawn < now:
+            _sundawn = self.sun(now + timedelta(days=1))["dawn"]
         return _sundawn
 
     @property
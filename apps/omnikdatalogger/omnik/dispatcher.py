@@ -0,0 +1,135 @@
+"""Queued dispatching of output messages to the output plugins."""
+
+from collections import deque
+from time import time
+import threading
+
+from omnik.ha_logger import hybridlogger
+
+# What to do with a new message when the queue of a plugin is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_POLICIES = [OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_BLOCK]
+
+
+class OutputWorker(object):
+    """Process the messages for an output plugin in a separate thread."""
+
+    def __init__(self, plugin, queue_size, overflow, logger, hass_api):
+        self.plugin = plugin
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.logger = logger
+        self.hass_api = hass_api
+        self.queue = deque()
+        self.access = threading.Condition(threading.Lock())
+        self._stop = False
+        # Metrics
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name=f"output_{plugin.name}", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, data):
+        # Make a snapshot, the datalogger reuses its data dicts
+        item = (time(), data.copy())
+        with self.access:
+            if len(self.queue) >= self.queue_size:
+                self._overflow(item)
+            else:
+                self.queue.append(item)
+            self.max_depth = max(self.max_depth, len(self.queue))
+            self.access.notify_all()
+
+    def _overflow(self, item):
+        if self.overflow == OVERFLOW_BLOCK:
+            # Wait until the worker has room for the message
+            self.access.wait_for(
+                lambda: len(self.queue) < self.queue_size or self._stop
+            )
+            self.queue.append(item)
+            return
+        if self.overflow == OVERFLOW_COALESCE:
+            # Replace the last queued message for the same plant
+            plant_id = item[1].get("plant_id")
+            for index in range(len(self.queue) - 1, -1, -1):
+                if self.queue[index][1].get("plant_id") == plant_id:
+                    self.queue[index] = (self.queue[index][0], item[1])
+                    self.coalesced += 1
+                    return
+        self.queue.popleft()
+        self.queue.append(item)
+        self.dropped += 1
+        hybridlogger.ha_log(
+            self.logger,
+            self.hass_api,
+            "WARNING",
+            f"Output queue for plugin '{self.plugin.name}' is full, dropped the oldest message.",
+        )
+
+    def _run(self):
+        while True:
+            with self.access:
+                self.access.wait_for(lambda: self.queue or self._stop)
+                if not self.queue:
+                    return
+                queued_at, data = self.queue.popleft()
+                self.access.notify_all()
+            failed = False
+            try:
+                self.plugin.process(msg=data)
+            except Exception as e:
+                failed = True
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "ERROR",
+                    f"Output plugin '{self.plugin.name}' failed processing a message. Error: {e!r}",
+                )
+            latency = time() - queued_at
+            with self.access:
+                self.errors += failed
+                self.processed += 1
+                self.last_latency = latency
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def stats(self):
+        """Return the queue depth and latency (seconds) metrics."""
+        with self.access:
+            return {
+                "queue_depth": len(self.queue),
+                "max_queue_depth": self.max_depth,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "last_latency": self.last_latency,
+                "avg_latency": (
+                    self.total_latency / self.processed if self.processed else 0.0
+                ),
+                "max_latency": self.max_latency,
+            }
+
+    def terminate(self, timeout=None):
+        # Process the queued messages before stopping the worker
+        with self.access:
+            self._stop = True
+            self.access.notify_all()
+        self._thread.join(timeout)
+        if self.queue:
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "WARNING",
+                f"Output plugin '{self.plugin.name}' has {len(self.queue)} unprocessed messages.",
+            )
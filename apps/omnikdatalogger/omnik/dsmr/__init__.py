@@ -1,9 +1,15 @@
 from dsmr_parser import obis_references
 from .terminal import Terminal
+from .coalesce import TelegramCoalescer, COALESCE_FIELDS
 from decimal import Decimal
 import threading
 from datetime import datetime
 from omnik.ha_logger import hybridlogger
+from omnik.scheduler import Worker
+
+# Seconds between the telegrams of a meter, DSMR 5 meters send a telegram every second
+TELEGRAM_INTERVAL = {"2.2": 10, "4": 10}
+TELEGRAM_INTERVAL_DEFAULT = 1
 
 
 class DSRM(object):
@@ -11,6 +17,7 @@ class DSRM(object):
     config = None
     logger = None
     hass_api = None
+    scheduler = None
     datalogger = None
 
     def initialize(self, terminals, dsmr_callback):
@@ -26,6 +33,9 @@ class DSRM(object):
         self.cache = {}
         self.ts_last_telegram = {}
         self.last_gas_update = {}
+        self.coalescer = {}
+        self.flush_jobs = {}
+        self.flush_worker = None
         self.tconfig = {}
         self.tconfig["tarif"] = {}
         if self.config.has_option("dsmr", "tarif"):
@@ -58,6 +68,10 @@ class DSRM(object):
             self.tconfig[terminal]["total_energy_offset"] = Decimal(
                 self.config.get(f"dsmr.{terminal}", "total_energy_offset", "0")
             )
+            self.tconfig[terminal]["coalesce_interval"] = float(
+                self.config.get(f"dsmr.{terminal}", "coalesce_interval", "0")
+            )
+            self._init_coalescer(terminal)
 
             # Init terminal sync parameters
             self.sync[terminal] = 0
@@ -75,10 +89,72 @@ class DSRM(object):
                 self.tconfig[terminal]["dsmr_version"],
             )
 
+    def _init_coalescer(self, terminal):
+        # Combine the telegrams within the interval to one message
+        interval = self.tconfig[terminal]["coalesce_interval"]
+        if not interval:
+            self.coalescer[terminal] = None
+            return
+        self.coalescer[terminal] = TelegramCoalescer(
+            interval,
+            self.config.getlist("dsmr", "coalesce_fields", fallback=COALESCE_FIELDS),
+        )
+        if self.scheduler:
+            # Forward the window when the terminal stops sending telegrams.
+            # The scheduler job only queues the flush, the window is forwarded by the flush worker.
+            if not self.flush_worker:
+                self.flush_worker = Worker(
+                    self.logger, self.hass_api, name="dsmr_flush"
+                )
+            self.flush_jobs[terminal] = self.scheduler.every(
+                interval, self.flush_worker.submit, self._flush_coalescer, terminal
+            )
+
+    def _flush_coalescer(self, terminal):
+        msg_dsmr = self.coalescer[terminal].flush()
+        if msg_dsmr:
+            self.dsmr_callback(terminal, msg_dsmr)
+
+    def _plant_terminals(self, plant_id):
+        return [
+            terminal
+            for terminal in self.terminals
+            if (self.tconfig[terminal]["plant_id"] or "0") == plant_id
+        ]
+
+    def connected(self, plant_id):
+        """Return True if a terminal that sends data for the plant is connected."""
+        return any(
+            self.terminals[terminal].connected
+            for terminal in self._plant_terminals(plant_id)
+        )
+
+    def coalescing(self, plant_id):
+        """Return True if a terminal that sends data for the plant coalesces its telegrams."""
+        return any(
+            self.coalescer[terminal] for terminal in self._plant_terminals(plant_id)
+        )
+
+    def telegram_interval(self, plant_id):
+        """Return the expected number of seconds between the telegrams for the plant."""
+        return min(
+            (
+                TELEGRAM_INTERVAL.get(
+                    self.tconfig[terminal]["dsmr_version"], TELEGRAM_INTERVAL_DEFAULT
+                )
+                for terminal in self._plant_terminals(plant_id)
+            ),
+            default=TELEGRAM_INTERVAL_DEFAULT,
+        )
+
     def terminate(self):
         # cleanup connection after user initiated shutdown
+        for job in self.flush_jobs.values():
+            job.cancel()
         for terminal in self.terminals:
             self.terminals[terminal].terminate()
+        if self.flush_worker:
+            self.flush_worker.stop()
 
     def _proces_power_current_fase(self, fase, msg_dsmr, telegram):
 
@@ -347,8 +423,13 @@ class DSRM(object):
             # Process Gas
             self._process_gas(msg_dsmr, telegram)
 
+            if self.coalescer[terminal]:
+                # Only forward a message when the coalesce interval has passed
+                msg_dsmr = self.coalescer[terminal].add(msg_dsmr)
+
             # Send back data to data logger
-            self.dsmr_callback(terminal, msg_dsmr)
+            if msg_dsmr:
+                self.dsmr_callback(terminal, msg_dsmr)
 
         # Increase terminal sync counter
         self.sync[terminal] += 1
@@ -0,0 +1,92 @@
+from decimal import Decimal
+from time import time
+import threading
+
+# Power fields for which the minimum, maximum and average over the window are added
+COALESCE_FIELDS = [
+    "current_net_power",
+    "current_net_power_l1",
+    "current_net_power_l2",
+    "current_net_power_l3",
+]
+
+
+class TelegramCoalescer(object):
+    """Combine the DSMR telegrams of a terminal received within a time window."""
+
+    def __init__(self, interval, fields=COALESCE_FIELDS):
+        self.interval = interval
+        self.fields = fields
+        self.window_start = None
+        self.last_timestamp = None
+        self.stats = {}
+        # The last telegram of the window that was not forwarded yet
+        self.pending = None
+        self.received = None
+        self.access = threading.Lock()
+
+    def _start_window(self, msg_dsmr):
+        self.window_start = msg_dsmr["timestamp"]
+        self.last_timestamp = msg_dsmr["timestamp"]
+        self.pending = None
+        # Keep min, max, the time weighted sum and the last value for each field
+        self.stats = {
+            field: [msg_dsmr[field], msg_dsmr[field], Decimal("0"), msg_dsmr[field]]
+            for field in self.fields
+            if field in msg_dsmr
+        }
+
+    def _weigh(self, timestamp):
+        # Weigh the previous values with the time they were valid
+        duration = Decimal(max(timestamp - self.last_timestamp, 0))
+        self.last_timestamp = timestamp
+        for stats in self.stats.values():
+            stats[2] += stats[3] * duration
+
+    def add(self, msg_dsmr):
+        """Add a telegram. Returns the coalesced message when the window has passed."""
+        with self.access:
+            self.received = time()
+            if self.window_start is None:
+                self._start_window(msg_dsmr)
+                return None
+            self._weigh(msg_dsmr["timestamp"])
+            for field, stats in self.stats.items():
+                if field in msg_dsmr:
+                    stats[0] = min(stats[0], msg_dsmr[field])
+                    stats[1] = max(stats[1], msg_dsmr[field])
+                    stats[3] = msg_dsmr[field]
+            if msg_dsmr["timestamp"] - self.window_start < self.interval:
+                self.pending = msg_dsmr
+                return None
+            return self._emit(msg_dsmr, msg_dsmr["timestamp"])
+
+    def flush(self):
+        """
+        Returns the coalesced message of the window when no telegram was received for an interval.
+        The next telegram starts a new window.
+        """
+        with self.access:
+            if not self.pending or time() - self.received < self.interval:
+                return None
+            msg_dsmr = self.pending
+            # Weigh the last values until now
+            self._weigh(msg_dsmr["timestamp"] + time() - self.received)
+            coalesced = self._emit(msg_dsmr, self.last_timestamp)
+            self.window_start = None
+            return coalesced
+
+    def _emit(self, msg_dsmr, window_end):
+        # Emit the latest telegram with the statistics of the window
+        window = window_end - self.window_start
+        coalesced = msg_dsmr.copy()
+        for field, stats in self.stats.items():
+            coalesced[f"{field}_min"] = stats[0]
+            coalesced[f"{field}_max"] = stats[1]
+            coalesced[f"{field}_avg"] = (
+                (stats[2] / Decimal(window)).quantize(stats[3])
+                if window > 0
+                else stats[3]
+            )
+        self._start_window(msg_dsmr)
+        return coalesced
@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+
+
+class TelegramHistory(object):
+    """Keep the last DSMR messages of a plant ordered by timestamp."""
+
+    def __init__(self, depth=10):
+        self.depth = max(1, depth)
+        # Items before self._start are expired, they are removed in chunks
+        self._start = 0
+        self._timestamps = []
+        self._messages = []
+
+    def __len__(self):
+        return len(self._timestamps) - self._start
+
+    @property
+    def last_timestamp(self):
+        """The timestamp of the most recent message, None if the history is empty."""
+        return self._timestamps[-1] if len(self) else None
+
+    def append(self, message):
+        timestamp = message["timestamp"]
+        if len(self) and timestamp < self._timestamps[-1]:
+            # Out of order message
+            index = bisect_right(self._timestamps, timestamp, lo=self._start)
+            self._timestamps.insert(index, timestamp)
+            self._messages.insert(index, message)
+        else:
+            self._timestamps.append(timestamp)
+            self._messages.append(message)
+        if len(self) > self.depth:
+            self._start += 1
+        if self._start >= self.depth:
+            # Drop the expired items
+            del self._timestamps[: self._start]
+            del self._messages[: self._start]
+            self._start = 0
+
+    def _neighbours(self, timestamp):
+        # Return the index of the last message before and the most recent message
+        # of the first timestamp at or after timestamp
+        index = bisect_left(self._timestamps, timestamp, lo=self._start)
+        if index == len(self._timestamps):
+            return index - 1, index
+        return index - 1, bisect_right(self._timestamps, self._timestamps[index]) - 1
+
+    def nearest(self, timestamp):
+        """Return the message with the timestamp nearest to timestamp."""
+        if not len(self):
+            return None
+        before, after = self._neighbours(timestamp)
+        if after == len(self._timestamps):
+            return self._messages[before]
+        if before < self._start:
+            return self._messages[after]
+        # The most recent message wins if both are equally close
+        if timestamp - self._timestamps[before] < self._timestamps[after] - timestamp:
+            return self._messages[before]
+        return self._messages[after]
+
+    def interpolate(self, timestamp):
+        """
+        Return the nearest message with the Decimal values interpolated linearly between
+        the messages before and after timestamp. Outside the history the nearest message is returned.
+        """
+        nearest = self.nearest(timestamp)
+        before, after = self._neighbours(timestamp)
+        if (
+            before < self._start
+            or after == len(self._timestamps)
+            or self._timestamps[after] == timestamp
+        ):
+            return nearest
+        first = self._messages[before]
+        last = self._messages[after]
+        fraction = Decimal(timestamp - self._timestamps[before]) / Decimal(
+            self._timestamps[after] - self._timestamps[before]
+        )
+        message = nearest.copy()
+        for field, value in first.items():
+            if not isinstance(value, Decimal) or not isinstance(
+                last.get(field), Decimal
+            ):
+                continue
+            if value == last[field]:
+                continue
+            # Keep the precision of the meter value
+            message[field] = (value + (last[field] - value) * fraction).quantize(
+                nearest[field]
+            )
+        message["timestamp"] = timestamp
+        return message
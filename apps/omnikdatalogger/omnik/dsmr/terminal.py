@@ -34,6 +34,8 @@ class Terminal(object):
         self.hass_api = hass_api
         self.terminal_name = terminal_name
         self.dsmr_serial_callback = dsmr_serial_callback
+        # True while the terminal is connected to the meter
+        self.connected = False
         self.mode = self.config.get(f"dsmr.{self.terminal_name}", "mode", "device")
         if self.mode not in ["tcp", "device"]:
             hybridlogger.ha_log(
@@ -130,6 +132,7 @@ class Terminal(object):
                 self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 self.sock.settimeout(5)
                 self.sock.connect(server_address)
+                self.connected = True
                 while not self.stop:
                     data = self.sock.recv(1024)
                     if not data and not self.stop:
@@ -157,6 +160,7 @@ class Terminal(object):
                     traceback.print_exception(*sys.exc_info())
                     time.sleep(5)
             finally:
+                self.connected = False
                 self.sock.close()
 
     def _run_serial_terminal(self):
@@ -172,6 +176,7 @@ class Terminal(object):
             try:
                 self.telegram_buffer = TelegramBuffer()
                 self.sock = serial.Serial(port=self.device, **self.serial_settings)
+                self.connected = True
                 while not self.stop:
                     data = self.sock.read_until()
                     if not data and not self.stop:
@@ -197,4 +202,5 @@ class Terminal(object):
                     )
                     time.sleep(5)
             finally:
+                self.connected = False
                 self.sock.close()
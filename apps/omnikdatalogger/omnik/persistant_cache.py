@@ -0,0 +1,188 @@
+"""Write-behind storage of the persistant energy cache."""
+
+import json
+import os
+import threading
+from decimal import Decimal
+
+from omnik.ha_logger import hybridlogger
+
+
+class PersistantCache(object):
+    """Keep the cache in a JSON file. Changes are written at most every flush_interval seconds."""
+
+    def __init__(self, path, flush_interval, logger, hass_api, scheduler=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.logger = logger
+        self.hass_api = hass_api
+        self.items = {}
+        self.dirty = False
+        self.access = threading.RLock()
+        self.scheduler = scheduler
+        self._timer = None
+
+    def load(self):
+        """Read the cache, returns the items with the numeric values as Decimal."""
+        with open(self.path) as cache_file:
+            self.items = json.load(cache_file)
+        return self._restore(self.items)
+
+    @staticmethod
+    def _restore(items):
+        cache = {}
+        for item in items:
+            try:
+                cache[item] = Decimal(f"{items[item]}")
+            except ArithmeticError:
+                cache[item] = items[item]
+        return cache
+
+    def update(self, items):
+        """Store the changed items, the file is written on the next flush."""
+        with self.access:
+            for key, value in items.items():
+                self.items[key] = float(value) if isinstance(value, Decimal) else value
+            self._changed(items)
+            if not self.flush_interval:
+                self.flush()
+            elif not self._timer:
+                # Schedule a flush
+                if self.scheduler:
+                    self._timer = self.scheduler.schedule(
+                        self.flush_interval, self.flush
+                    )
+                else:
+                    self._timer = threading.Timer(self.flush_interval, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def _changed(self, items):
+        self.dirty = True
+
+    def flush(self):
+        """Write the changes to disk."""
+        with self.access:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not self.dirty:
+                return
+            try:
+                self._write()
+                self.dirty = False
+            except Exception as e:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "ERROR",
+                    f"Cache file '{self.path}' can not be written! Error: {e.args}",
+                )
+
+    def _write(self):
+        self._replace(self.path, self.items)
+
+    @staticmethod
+    def _replace(path, items):
+        # Write to a temporary file first, a crash can not leave a partly written cache file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(items, cache_file)
+            cache_file.flush()
+            os.fsync(cache_file.fileno())
+        os.replace(temp_path, path)
+
+    def close(self):
+        """Write pending changes."""
+        self.flush()
+
+
+class JournalCache(PersistantCache):
+    """
+    Append the changed items to a journal next to the cache file. At startup the journal
+    is replayed over the cache file. The journal is compacted into the cache file when
+    it holds journal_size records and when the cache is closed.
+    """
+
+    def __init__(
+        self, path, flush_interval, logger, hass_api, scheduler=None, journal_size=1000
+    ):
+        super().__init__(path, flush_interval, logger, hass_api, scheduler)
+        self.journal_path = f"{path}.journal"
+        self.journal_size = journal_size
+        self.records = 0
+        self.pending = {}
+
+    def load(self):
+        try:
+            with open(self.path) as cache_file:
+                self.items = json.load(cache_file)
+        except FileNotFoundError:
+            if not os.path.exists(self.journal_path):
+                raise
+        self.records = self._replay()
+        return self._restore(self.items)
+
+    def _replay(self):
+        records = 0
+        if not os.path.exists(self.journal_path):
+            return records
+        with open(self.journal_path) as journal:
+            for line in journal:
+                try:
+                    self.items.update(json.loads(line))
+                except ValueError:
+                    break
+                records += 1
+            else:
+                return records
+        # A crash can leave a partly written last record, new records can not be appended to it
+        hybridlogger.ha_log(
+            self.logger,
+            self.hass_api,
+            "WARNING",
+            f"Ignoring incomplete record in cache journal '{self.journal_path}'.",
+        )
+        self._compact()
+        return 0
+
+    def _changed(self, items):
+        # Only the last value of a key is written with the next flush
+        for key in items:
+            self.pending[key] = self.items[key]
+        self.dirty = True
+
+    def _write(self):
+        with open(self.journal_path, "a") as journal:
+            journal.write(f"{json.dumps(self.pending, separators=(',', ':'))}\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        self.pending = {}
+        self.records += 1
+        if self.records >= self.journal_size:
+            self._compact()
+
+    def _compact(self):
+        # The records hold the new values, replaying the journal again after a crash is harmless
+        self._replace(self.path, self.items)
+        with open(self.journal_path, "w"):
+            pass
+        self.records = 0
+
+    def close(self):
+        with self.access:
+            self.flush()
+            if self.records and not self.dirty:
+                try:
+                    self._compact()
+                except Exception as e:
+                    hybridlogger.ha_log(
+                        self.logger,
+                        self.hass_api,
+                        "ERROR",
+                        f"Cache journal '{self.journal_path}' can not be compacted! Error: {e.args}",
+                    )
+
+
+# Available persistant_cache_backend options
+PERSISTANT_CACHE_BACKENDS = ["json", "journal"]
@@ -3,6 +3,26 @@ from time import time
 from decimal import Decimal
 
 
+class PlantState:
+    """The cached energy state of a plant, stored as `{plant_id}.{field}` in the persistant cache."""
+
+    __slots__ = (
+        "last_total_energy",
+        "last_today_energy",
+        "last_current_power",
+        "last_reset",
+        "last_update",
+    )
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, None)
+
+    def items(self, plant_id, fields=__slots__):
+        """Return the fields as flat persistant cache items."""
+        return {f"{plant_id}.{field}": getattr(self, field) for field in fields}
+
+
 class Plant:
     def __init__(self, plant_id=None, last_update_time=time(), *args, **kwargs):
         self._plant_id = plant_id
@@ -15,7 +35,7 @@ class Plant:
     def plant_id(self):
         return self._plant_id
 
-    def pop_for_aggregate(self, cache):
+    def pop_for_aggregate(self, state):
         data_age = (datetime.now(timezone.utc) - self._last_update_time).seconds
         if data_age > 360:
             # data is too old discard, use cache
@@ -23,17 +43,16 @@ class Plant:
             # return True to ensure publising
             if not self._data:
                 self._data = {}
-            try:
-                self._data["total_energy"] = cache[
-                    f"{self._plant_id}.last_total_energy"
-                ]
-                self._data["today_energy"] = cache[
-                    f"{self._plant_id}.last_today_energy"
-                ]
-                self._data["current_power"] = Decimal("0.0")
-                self._data["last_update"] = time()
-            except:
+            if (
+                not state
+                or state.last_total_energy is None
+                or state.last_today_energy is None
+            ):
                 return False
+            self._data["total_energy"] = state.last_total_energy
+            self._data["today_energy"] = state.last_today_energy
+            self._data["current_power"] = Decimal("0.0")
+            self._data["last_update"] = time()
             return True
         if self._updated:
             self._updated = False
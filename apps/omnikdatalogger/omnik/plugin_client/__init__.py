@@ -21,5 +21,9 @@ class Client(object, metaclass=BaseClient):
     def initialize(self):
         return True
 
+    def submitPlantData(self, executor, plant_id):
+        # Schedule a getPlantData request and return a future for the result
+        return executor.submit(self.getPlantData, plant_id)
+
     def terminate(self):
         return True
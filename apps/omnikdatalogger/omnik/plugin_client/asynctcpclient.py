@@ -0,0 +1,184 @@
+from omnik.ha_logger import hybridlogger
+import omnik.InverterMsg
+from omnik.plugin_client import Client
+import asyncio
+import binascii
+import threading
+
+
+class AsyncTCPclient(Client):
+
+    # IMPORTANT : ONLY WIFI Modules with s/n 602xxxxxx and 604xxxxxx support direct access thru port 8899!
+    # All inverter connections are multiplexed on a single asyncio event loop that runs in its own thread.
+    # Polling many inverters takes about as long as polling the slowest one.
+    # There is no http fallback, use the tcpclient if your inverter only supports http.
+
+    def __init__(self):
+        super().__init__()
+        hybridlogger.ha_log(
+            self.logger, self.hass_api, "INFO", "Client enabled: AsyncTCPclient"
+        )
+
+        # Get plant_id_list
+        self.plant_id_list = self.config.getlist(
+            "client.asynctcpclient", "plant_id_list", fallback=[]
+        )
+        if not self.plant_id_list:
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "ERROR",
+                "plant_id_list was not specified for client AsyncTCPclient",
+            )
+            raise Exception("plant_id_list was not specified")
+        # The maximum number of inverter connections that are open at the same time
+        self.max_connections = int(
+            self.config.get("client.asynctcpclient", "max_connections", fallback="100")
+        )
+        # Initialize dict with inverter info
+        self.inverters = {}
+        self._connections = None
+
+        # Start the event loop
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="asynctcpclient", daemon=True
+        )
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def terminate(self):
+        # Stop the event loop and wait for the thread to finish
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def getPlants(self):
+        data = []
+        for plant in self.plant_id_list:
+            inverter_address = self.config.get(
+                f"plant.{plant}", "inverter_address", fallback=None
+            )
+            logger_sn = self.config.get(f"plant.{plant}", "logger_sn", fallback=None)
+            inverter_sn = self.config.get(
+                f"plant.{plant}", "inverter_sn", fallback=None
+            )
+            if not inverter_address or not logger_sn or not inverter_sn:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "ERROR",
+                    "inverter_address, logger_sn and inverter_sn "
+                    f"for plant {plant} should be specified [AsyncTCPclient]",
+                )
+                raise Exception(
+                    "an inverter_address, logger_sn or inverter_sn was not specified"
+                )
+            self.inverters[plant] = {
+                "inverter_address": inverter_address,
+                "inverter_port": int(
+                    self.config.get(f"plant.{plant}", "inverter_port", fallback="8899")
+                ),
+                "logger_sn": int(logger_sn),
+                "inverter_sn": inverter_sn,
+                "connect_timeout": float(
+                    self.config.get(f"plant.{plant}", "connect_timeout", fallback="10")
+                ),
+                "read_timeout": float(
+                    self.config.get(f"plant.{plant}", "read_timeout", fallback="30")
+                ),
+            }
+            data.append({"plant_id": plant})
+
+        hybridlogger.ha_log(
+            self.logger, self.hass_api, "DEBUG", f"plant list from config {data}"
+        )
+
+        return data
+
+    def submitPlantData(self, executor, plant_id):
+        # Schedule the request on the event loop, no worker thread is needed
+        return asyncio.run_coroutine_threadsafe(
+            self._getPlantData(plant_id), self._loop
+        )
+
+    def getPlantData(self, plant_id):
+        return self.submitPlantData(None, plant_id).result()
+
+    async def _getPlantData(self, plant_id):
+        inverter = self.inverters[plant_id]
+        # Create request message
+        requestmsg = omnik.InverterMsg.request_string(inverter["logger_sn"])
+        if not self._connections:
+            self._connections = asyncio.Semaphore(self.max_connections)
+        async with self._connections:
+            writer = None
+            try:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "DEBUG",
+                    f"Connecting to {inverter['inverter_address']} port {inverter['inverter_port']}",
+                )
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(
+                        inverter["inverter_address"], inverter["inverter_port"]
+                    ),
+                    inverter["connect_timeout"],
+                )
+                # Sending request message
+                writer.write(requestmsg)
+                await writer.drain()
+                # Wait for response
+                rawmsg = await asyncio.wait_for(
+                    reader.read(129), inverter["read_timeout"]
+                )
+            except (OSError, asyncio.TimeoutError) as warn:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "INFO",
+                    f"Inverter for plant {plant_id} is not reachable over port {inverter['inverter_port']}, "
+                    f"this is normal when it is dark. {warn!r}",
+                )
+                return None
+            finally:
+                if writer:
+                    writer.close()
+
+        return self._decode_response(plant_id, rawmsg)
+
+    def _decode_response(self, plant_id, rawmsg):
+        data = {}
+        # Validate the data response. Check length and serial number
+        if len(rawmsg) >= 99:
+            inverterMsg = omnik.InverterMsg.InverterMsg(rawmsg)
+            serialnr = inverterMsg.getID()
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "DEBUG",
+                f"data size: {len(rawmsg)}.\n"
+                f"Datadump: {str(binascii.b2a_base64(rawmsg))}",
+            )
+            if self.inverters[plant_id]["inverter_sn"] == serialnr:
+                data["plant_id"] = plant_id
+                # Get the data from the received message
+                inverterMsg.FetchDataDict(data)
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "DEBUG",
+                    f"New message received from inverter '{serialnr}'",
+                )
+                return data
+        hybridlogger.ha_log(
+            self.logger,
+            self.hass_api,
+            "WARNING",
+            f"Invalid response for plant {plant_id}, ignoring message",
+        )
+        return None
@@ -2,7 +2,8 @@ from omnik.ha_logger import hybridlogger
 import omnik.InverterMsg
 from omnik.plugin_client import Client
 from omnik.plugin_localproxy import LocalProxyPlugin
-import time
+from collections import OrderedDict
+import itertools
 import threading
 import importlib
 
@@ -24,7 +25,13 @@ class LocalProxy(Client):
         # Create a semaphore for unique access to the processing loop
         self.semaphore = threading.Semaphore()
         self.msgevent = threading.Event()
-        self.msg = {"isSet": False, "data": None, "plugin": None}
+        # Received frames waiting to be processed, keyed by the inverter serial number
+        self.frames = OrderedDict()
+        self.frame_access = threading.Lock()
+        self._frame_sequence = itertools.count()
+        self.queue_size = max(
+            1, int(self.config.get("client.localproxy", "queue_size", fallback=64))
+        )
 
         # Get plant_id_list
         self.plant_id_list = self.config.getlist(
@@ -109,45 +116,74 @@ class LocalProxy(Client):
         self.semaphore.release()
         return data
 
+    def put_frame(self, frame, plugin):
+        """Queue a frame received by a localproxy plugin. A queued frame of the same inverter is replaced."""
+        key = (
+            omnik.InverterMsg.InverterMsg(frame).getID()
+            if len(frame) == 128
+            else next(self._frame_sequence)
+        )
+        with self.frame_access:
+            if key in self.frames:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "DEBUG",
+                    f"Replacing the unprocessed message from inverter '{key}'.",
+                )
+            elif len(self.frames) >= self.queue_size:
+                self.frames.popitem(last=False)
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "WARNING",
+                    "Message queue is full, dropped the oldest message.",
+                )
+            self.frames[key] = (frame, plugin)
+            # Trigger processing the message
+            self.msgevent.set()
+
     def getPlantData(self, plant_id=None):
         # Wait here for a message
         self.msgevent.wait()
+        with self.frame_access:
+            if not self.frames:
+                # Stopping
+                return None
+            frame, plugin = self.frames.popitem(last=False)[1]
+            if not self.frames:
+                self.msgevent.clear()
         # Claim the semaphore
         valid = False
         data = None
         self.semaphore.acquire()
         try:
-            if self.msg["isSet"]:
-                data = {}
-                if self.msg["data"]:
-                    if len(self.msg["data"]) == 128:
-                        inverterMsg = omnik.InverterMsg.InverterMsg(self.msg["data"])
-                        serialnr = inverterMsg.getID()
-                        # lookup plant_id to see it is in the plants list
-                        for plant in self.plant_id_list:
-                            if self.inverters[plant]["inverter_sn"] == serialnr:
-                                data["plant_id"] = plant
-                                valid = True
-                if valid:
-                    # Get the data from the received message
-                    inverterMsg.FetchDataDict(data)
-                    hybridlogger.ha_log(
-                        self.logger,
-                        self.hass_api,
-                        "DEBUG",
-                        f"New message received from inverter '{serialnr}. Plugin: {self.msg['plugin']}'",
-                    )
-                else:
-                    hybridlogger.ha_log(
-                        self.logger,
-                        self.hass_api,
-                        "WARNING",
-                        "Invalid response, ignoring message",
-                    )
-                    data = None
-
-                # Reset isSet flag
-                self.msg["isSet"] = False
+            data = {}
+            if len(frame) == 128:
+                inverterMsg = omnik.InverterMsg.InverterMsg(frame)
+                serialnr = inverterMsg.getID()
+                # lookup plant_id to see it is in the plants list
+                for plant in self.plant_id_list:
+                    if self.inverters[plant]["inverter_sn"] == serialnr:
+                        data["plant_id"] = plant
+                        valid = True
+            if valid:
+                # Get the data from the received message
+                inverterMsg.FetchDataDict(data)
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "DEBUG",
+                    f"New message received from inverter '{serialnr}. Plugin: {plugin}'",
+                )
+            else:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "WARNING",
+                    "Invalid response, ignoring message",
+                )
+                data = None
 
         except Exception as e:
             hybridlogger.ha_log(
@@ -156,9 +192,6 @@ class LocalProxy(Client):
                 "WARNING",
                 f"Error occured while processing message. Error: {e}",
             )
-        # Release the semaphore and event
+        # Release the semaphore
         self.semaphore.release()
-        self.msgevent.clear()
-        # take some sleep to relax
-        time.sleep(1)
         return data
@@ -10,9 +10,7 @@ class HASSAPI(LocalProxyPlugin):
     Use scripts/proxy/omnikloggerproxy.py to capture the inverter events and publish the data to MQTT (Home Assistant)
 
     This class makes use of the following localproxy client attributes
-    self.client.msg
-    self.client.msgevent
-    self.client.semaphore
+    self.client.put_frame
     self.client.inverters
     self.client.plant_id_list
     """
@@ -80,14 +78,8 @@ class HASSAPI(LocalProxyPlugin):
         try:
             data = binascii.a2b_base64(new)
             if len(data) == 128:
-                # Fill data structure
-                self.client.semaphore.acquire()
-                self.client.msg["data"] = data
-                self.client.msg["isSet"] = True
-                self.client.msg["plugin"] = __name__
-                self.client.semaphore.release()
-                # Trigger processing the message
-                self.client.msgevent.set()
+                # Queue the message for processing
+                self.client.put_frame(data, __name__)
         except Exception as e:
             hybridlogger.ha_log(
                 self.logger,
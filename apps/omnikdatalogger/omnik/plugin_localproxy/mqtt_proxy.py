@@ -14,9 +14,7 @@ class MQTTproxy(LocalProxyPlugin):
     If you are using Home Assistant consider a setup with AppDaemon and the hassapi plugin to collect the published data
 
     This class makes use the following localproxy client objects
-    self.client.msg
-    self.client.msgevent
-    self.client.semaphore
+    self.client.put_frame
     self.client.inverters
     self.client.plant_id_list
     """
@@ -106,14 +104,8 @@ class MQTTproxy(LocalProxyPlugin):
             payload = json.loads(message.payload)
             data = binascii.a2b_base64(payload["data"])
             if len(data) == 128:
-                # Fill data structure
-                self.client.semaphore.acquire()
-                self.client.msg["data"] = data
-                self.client.msg["isSet"] = True
-                self.client.msg["plugin"] = __name__
-                self.client.semaphore.release()
-                # Trigger processing the message
-                self.client.msgevent.set()
+                # Queue the message for processing
+                self.client.put_frame(data, __name__)
         except Exception as e:
             hybridlogger.ha_log(
                 self.logger,
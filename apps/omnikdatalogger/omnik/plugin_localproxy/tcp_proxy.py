@@ -13,14 +13,8 @@ class RequestHandler(socketserver.BaseRequestHandler):
         data = self.request.recv(1024)
 
         if self.client and len(data) >= 99:
-            # Fill data structure
-            self.client.semaphore.acquire()
-            self.client.msg["data"] = data
-            self.client.msg["isSet"] = True
-            self.client.msg["plugin"] = __name__
-            self.client.semaphore.release()
-            # Trigger processing the message
-            self.client.msgevent.set()
+            # Queue the message for processing
+            self.client.put_frame(data, __name__)
 
 
 class TCPproxy(LocalProxyPlugin):
@@ -31,9 +25,7 @@ class TCPproxy(LocalProxyPlugin):
     The scripts/proxy/omnikloggerproxy script can also be used to capture and forward to this listener
 
     This class makes use the following localproxy client objects
-    self.client.msg
-    self.client.msgevent
-    self.client.semaphore
+    self.client.put_frame
     self.client.inverters
     self.client.plant_id_list
     """
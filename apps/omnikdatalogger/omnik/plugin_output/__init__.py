@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 from cachetools import TTLCache
 from omnik.ha_logger import hybridlogger
 from decimal import Decimal
@@ -23,6 +24,7 @@ class Plugin(object, metaclass=BasePlugin):
     config = None
     logger = None
     hass_api = None
+    scheduler = None
     process_aggregates = False
     process_output = False
     name = "plugin_output"
@@ -30,6 +32,50 @@ class Plugin(object, metaclass=BasePlugin):
 
     cache = TTLCache(maxsize=1, ttl=300)
 
+    session = None
+    timeout = None
+
+    def init_session(self, section):
+        """Creates a requests session that keeps connections alive and reuses them."""
+        self.timeout = (
+            float(self.config.get(section, "connect_timeout", fallback="10")),
+            float(self.config.get(section, "read_timeout", fallback="30")),
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=int(self.config.get(section, "pool_size", fallback="2")),
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+    def connection_stats(self):
+        """Returns the number of requests and new connections made by the session."""
+        stats = {"requests": 0, "connections": 0}
+        if self.session:
+            pools = self._adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                stats["requests"] += pool.num_requests
+                stats["connections"] += pool.num_connections
+        stats["reused"] = stats["requests"] - stats["connections"]
+        return stats
+
+    def log_connection_stats(self):
+        stats = self.connection_stats()
+        hybridlogger.ha_log(
+            self.logger,
+            self.hass_api,
+            "DEBUG",
+            f"Connections for '{self.name}': {stats['requests']} requests, "
+            f"{stats['connections']} connections made, {stats['reused']} reused",
+        )
+
+    def close_session(self):
+        if self.session:
+            self.session.close()
+            self.session = None
+
     def jsonval(self, value):
         if isinstance(value, Decimal):
             if float(value) == int(value):
@@ -1,4 +1,5 @@
 import csv
+import os
 import threading
 from time import strftime, localtime
 from os import path
@@ -44,6 +45,61 @@ def _ensure_headers(csvfile, fields, separator, no_headers):
     return headers
 
 
+class CsvFile(object):
+    """An open CSV file. The headers are validated when the file is (re)opened."""
+
+    def __init__(self, csvfile, separator, fields, no_headers):
+        self.csvfile = csvfile
+        self.separator = separator
+        self.fields = fields
+        self.no_headers = no_headers
+        self.file_object = None
+        self.writer = None
+        self.headers = None
+        # Device and inode of the validated file, a change means the file was rotated
+        self.file_id = None
+        self.unflushed = False
+
+    def rotated(self):
+        try:
+            stat = os.stat(self.csvfile)
+        except FileNotFoundError:
+            return True
+        return (stat.st_dev, stat.st_ino) != self.file_id
+
+    def open(self):
+        """Validate the headers and open the file for appending, returns the headers."""
+        self.close()
+        self.headers = _ensure_headers(
+            self.csvfile, self.fields, self.separator, self.no_headers
+        )
+        stat = os.stat(self.csvfile)
+        self.file_id = (stat.st_dev, stat.st_ino)
+        if self.headers:
+            self.file_object = open(self.csvfile, "a")
+            self.writer = csv.writer(self.file_object, delimiter=self.separator)
+        return self.headers
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+        self.unflushed = True
+
+    def flush(self):
+        if self.file_object and self.unflushed:
+            self.file_object.flush()
+            os.fsync(self.file_object.fileno())
+            self.unflushed = False
+
+    def close(self):
+        if self.file_object:
+            try:
+                self.flush()
+            finally:
+                self.file_object.close()
+        self.file_object = None
+        self.writer = None
+
+
 class csvoutput(Plugin):
     def __init__(self):
         super().__init__()
@@ -54,6 +110,16 @@ class csvoutput(Plugin):
         self.process_output = True
         # Make instance to run exclusively
         self.access = threading.Condition(threading.Lock())
+        # The output settings per config section and the open files
+        self.targets = {}
+        self.files = {}
+        # Buffered rows are flushed and synced to disk every flush_interval seconds
+        self.flush_interval = float(
+            self.config.get("output.csvoutput", "flush_interval", fallback=10)
+        )
+        self._flush_job = None
+        if self.flush_interval and self.scheduler:
+            self._flush_job = self.scheduler.every(self.flush_interval, self.flush)
         hybridlogger.ha_log(
             self.logger,
             self.hass_api,
@@ -61,36 +127,23 @@ class csvoutput(Plugin):
             "CSV output plugin enabled.",
         )
 
-    def _get_temperature(self, msg, config_section):
+    def _get_temperature(self, values, config_section):
         """Get the temperature from the open weater API"""
         if self.config.getboolean(config_section, "use_temperature", fallback=False):
             weather = self.get_weather()
-            msg["temperature"] = weather["main"]["temp"]
+            values["temperature"] = weather["main"]["temp"]
 
-    def process(self, **args):
-        """
-        Send data to csv
-        """
-        # Assign output file and fields to log
-        msg = args["msg"]
-        # Do not log cached data
-        if msg.get("cached"):
-            hybridlogger.ha_log(
-                self.logger,
-                self.hass_api,
-                "DEBUG",
-                "Ignoring previously cached data for CSV output.",
-            )
-            return
-        config_section = (
-            f'plant.{msg.get("plant_id")}' if msg.get("plant_id") else "output.csv"
-        )
+    def _target(self, config_section):
+        # Read the settings of a config section once, returns None if CSV logging is not configured
+        if config_section in self.targets:
+            return self.targets[config_section]
         csvfile = self.config.get(config_section, "csvfile", fallback=None)
         separator = self.config.get(config_section, "separator", fallback=";")
         fields = self.config.getlist(config_section, "fields", fallback=DEFAULT_FIELDS)
         no_headers = self.config.getboolean(
             config_section, "no_headers", fallback=False
         )
+        target = None
         if fields and fields[0] and csvfile:
             hybridlogger.ha_log(
                 self.logger,
@@ -98,59 +151,128 @@ class csvoutput(Plugin):
                 "DEBUG",
                 f"CSV output: {fields}. Config key '{config_section}'.",
             )
+            target = (csvfile, separator, fields, no_headers)
+        elif not csvfile:
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "DEBUG",
+                f"Skipping CSV logging, no output file defined. Config key '{config_section}'",
+            )
         else:
-            if not csvfile:
-                hybridlogger.ha_log(
-                    self.logger,
-                    self.hass_api,
-                    "DEBUG",
-                    f"Skipping CSV logging, no output file defined. Config key '{config_section}'",
-                )
-            else:
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "WARNING",
+                f"No output fields configured! CSV monitoring disabled. Config key '{config_section}'",
+            )
+        self.targets[config_section] = target
+        return target
+
+    def _open(self, csvfile, separator, fields, no_headers):
+        # Returns the open file, the headers are validated again when the file was rotated
+        csv_file = self.files.get(csvfile)
+        if not csv_file:
+            csv_file = CsvFile(csvfile, separator, fields, no_headers)
+            self.files[csvfile] = csv_file
+        if csv_file.rotated() and not csv_file.open():
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "ERROR",
+                "Skipping CSV logging, file exists with invalid header structure or unequal field count.",
+            )
+        return csv_file if csv_file.writer else None
+
+    def flush(self):
+        """Write the buffered rows to disk."""
+        with self.access:
+            self._flush_files()
+
+    def _flush_files(self):
+        for csv_file in self.files.values():
+            try:
+                csv_file.flush()
+            except OSError as os_err:
                 hybridlogger.ha_log(
                     self.logger,
                     self.hass_api,
-                    "WARNING",
-                    f"No output fields configured! CSV monitoring disabled. Config key '{config_section}'",
+                    "ERROR",
+                    f"File exception error for '{csv_file.csvfile}': {os_err.args}",
                 )
+
+    def process(self, **args):
+        """
+        Send data to csv
+        """
+        # Assign output file and fields to log
+        msg = args["msg"]
+        # Do not log cached data
+        if msg.get("cached"):
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "DEBUG",
+                "Ignoring previously cached data for CSV output.",
+            )
             return
-        try:
-            self.access.acquire()
-            # Ensure headers
-            headers = _ensure_headers(csvfile, fields, separator, no_headers)
-            if not headers:
+        config_section = (
+            f'plant.{msg.get("plant_id")}' if msg.get("plant_id") else "output.csv"
+        )
+        target = self._target(config_section)
+        if not target:
+            return
+        with self.access:
+            try:
+                csv_file = self._open(*target)
+                if not csv_file:
+                    return
+                # Append the log
+                reporttime = localtime(msg.get("last_update", time.time()))
+                # The message is shared with the other plugins, added values are kept apart
+                values = {
+                    "date": strftime("%Y-%m-%d", reporttime),
+                    "time": strftime("%H:%M:%S", reporttime),
+                }
+                self._get_temperature(values, config_section)
+                # Log output fields
+                self.log_available_fields(msg)
+                # write field to csv file
+                csv_file.writerow(
+                    [
+                        values[field] if field in values else msg.get(field)
+                        for field in csv_file.headers
+                    ]
+                )
+                if not self._flush_job:
+                    csv_file.flush()
+
+            except OSError as os_err:
                 hybridlogger.ha_log(
                     self.logger,
                     self.hass_api,
                     "ERROR",
-                    "Skipping CSV logging, file exists with invalid header structure or unequal field count.",
+                    f"File exception error for '{target[0]}': {os_err.args}",
                 )
-            else:
-                # Append the log
-                with open(csvfile, "a") as file_object:
-                    reporttime = localtime(msg.get("last_update", time.time()))
-                    self._get_temperature(msg, config_section)
-                    msg.update(
-                        {
-                            "date": strftime("%Y-%m-%d", reporttime),
-                            "time": strftime("%H:%M:%S", reporttime),
-                        }
-                    )
-                    # Log output fields
-                    self.log_available_fields(msg)
-                    # write field to csv file
-                    fields = list()
-                    for field in headers:
-                        fields.append(msg.get(field))
-                    writer = csv.writer(file_object, delimiter=separator)
-                    writer.writerow(fields)
+                # Open and validate the file again with the next message
+                self._close(self.files.pop(target[0], None))
 
+    def _close(self, csv_file):
+        if not csv_file:
+            return
+        try:
+            csv_file.close()
         except OSError as os_err:
             hybridlogger.ha_log(
                 self.logger,
                 self.hass_api,
                 "ERROR",
-                f"File exception error for '{csvfile}': {os_err.args}",
+                f"File exception error for '{csv_file.csvfile}': {os_err.args}",
             )
-        finally:
-            self.access.release()
+
+    def terminate(self):
+        if self._flush_job:
+            self._flush_job.cancel()
+        with self.access:
+            while self.files:
+                self._close(self.files.popitem()[1])
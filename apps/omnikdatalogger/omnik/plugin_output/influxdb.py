@@ -5,6 +5,8 @@ import requests
 from omnik.ha_logger import hybridlogger
 
 from omnik.plugin_output import Plugin
+from collections import deque
+from itertools import islice
 import threading
 
 
@@ -88,6 +90,7 @@ class influxdb(Plugin):
                     "WARNING",
                     "Authentication was set or incomplete!",
                 )
+            self.init_session("output.influxdb")
 
         self.timestamp_field = {}
         for field in self.config.data_field_config:
@@ -95,6 +98,49 @@ class influxdb(Plugin):
                 continue
             self.timestamp_field[self.config.data_field_config[field]["asset"]] = field
         self.access = threading.Condition(threading.Lock())
+        self._compile_fields()
+
+        # Buffered writing, points are queued and written by a background thread
+        self.write_buffer = self.config.getboolean(
+            "output.influxdb", "write_buffer", fallback=False
+        )
+        if self.write_buffer:
+            self.flush_interval = float(
+                self.config.get("output.influxdb", "flush_interval", fallback="10")
+            )
+            self.batch_size = int(
+                self.config.get("output.influxdb", "batch_size", fallback="1000")
+            )
+            self.max_buffer = int(
+                self.config.get("output.influxdb", "max_buffer", fallback="50000")
+            )
+            self.max_backoff = float(
+                self.config.get("output.influxdb", "max_backoff", fallback="300")
+            )
+            self.buffer = deque()
+            self.dropped = 0
+            self._stop = False
+            self.buffer_access = threading.Condition(threading.Lock())
+            self._flush_thread = threading.Thread(
+                target=self._flush_loop, name="influxdb_flush", daemon=True
+            )
+            self._flush_thread.start()
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "INFO",
+                f"InfluxDB write buffer enabled. Flushing every {self.flush_interval} seconds "
+                f"or when {self.batch_size} points are queued.",
+            )
+
+    def terminate(self):
+        if self.write_buffer:
+            # Stop the flush thread after writing the remaining points
+            with self.buffer_access:
+                self._stop = True
+                self.buffer_access.notify()
+            self._flush_thread.join()
+        self.close_session()
 
     def _get_temperature(self, values):
         if self.config.getboolean("output.influxdb", "use_temperature", fallback=False):
@@ -102,60 +148,159 @@ class influxdb(Plugin):
             values["temperature"] = str(weather["main"]["temp"])
             values["timestamp_ow"] = weather["main"]["dt"]
 
-    def _get_attributes(self, values, asset_class):
-        attributes = {}
-        for att in self.config.attributes["asset"][asset_class]:
+    def _compile_field(self, field):
+        # Precompile the line protocol template of a field, only the attribute values,
+        # the value and the timestamp are formatted when a message is written
+        field_config = self.config.data_field_config[field]
+        if not field_config["measurement"]:
+            # no measurement, exclude
+            return None
+        if field_config["dev_cla"] == "timestamp":
+            # skip the epoch fields
+            return None
+        asset_class = field_config["asset"]
+        attributes = []
+        for att in self.config.attributes["asset"].get(asset_class, []):
             if att in self.config.data_field_config:
                 if self.config.data_field_config[att]["dev_cla"] == "timestamp":
                     continue
-            attributes[att] = values[att]
-        return attributes.copy()
-
-    def _get_tags(self, field, attributes, asset_class):
-        tags = attributes.copy()
-        tags["asset"] = asset_class
-        tags["entity"] = field
-        tags["name"] = str(self.config.data_field_config[field]["name"]).replace(
-            " ", "\\ "
+            attributes.append(att)
+        # Attribute tags come first, tags from data_fields.json can override them
+        tags = {att: "{" + str(index) + "}" for index, att in enumerate(attributes)}
+        static_tags = {"asset": asset_class, "entity": field}
+        static_tags["name"] = str(field_config["name"]).replace(" ", "\\ ")
+        if field_config["dev_cla"]:
+            static_tags["dev_cla"] = field_config["dev_cla"]
+        if field_config["unit"]:
+            static_tags["unit"] = str(field_config["unit"]).replace(" ", "\\ ")
+        static_tags.update(field_config["tags"])
+        for key, value in static_tags.items():
+            tags[key] = str(value).replace("{", "{{").replace("}", "}}")
+        measurement = (
+            str(field_config["measurement"]).replace("{", "{{").replace("}", "}}")
         )
-        if self.config.data_field_config[field]["dev_cla"]:
-            tags["dev_cla"] = self.config.data_field_config[field]["dev_cla"]
-        if self.config.data_field_config[field]["unit"]:
-            tags["unit"] = str(self.config.data_field_config[field]["unit"]).replace(
-                " ", "\\ "
-            )
-        tags.update(self.config.data_field_config[field]["tags"])
-        return tags.copy()
-
-    def _format_output(self, field, values):
-        if field not in self.config.data_field_config:
-            return ""
-        if not self.config.data_field_config[field]["measurement"]:
-            # no measurement, exclude
-            return ""
-
-        if self.config.data_field_config[field]["dev_cla"] == "timestamp":
-            # skip the epoch fields
-            return ""
-
-        asset_class = self.config.data_field_config[field]["asset"]
-        attributes = self._get_attributes(values, asset_class)
-        nanoepoch = int(
-            values[self.timestamp_field.get(asset_class) or "last_update"] * 1000000000
+        # format output data using the InfluxDB line protocol
+        # https://v2.docs.influxdata.com/v2.0/write-data/#line-protocol
+        template = (
+            f'{measurement},{",".join(f"{key}={value}" for key, value in tags.items())} '
+            "value={value} {nanoepoch}\n"
         )
+        return asset_class, tuple(attributes), template
 
-        if field in values and self.config.data_field_config:
-            # Get tags
-            tags = self._get_tags(field, attributes, asset_class)
-            # format output data using the InfluxDB line protocol
-            # https://v2.docs.influxdata.com/v2.0/write-data/#line-protocol
-            return (
-                f'{self.config.data_field_config[field]["measurement"]},'
-                f'{",".join("{}={}".format(key, value) for key, value in tags.items())} '
-                f"value={values[field]} {nanoepoch}\n"
+    def _compile_fields(self):
+        self.templates = {}
+        for field in self.config.data_field_config:
+            compiled = self._compile_field(field)
+            if compiled:
+                self.templates[field] = compiled
+
+    def _encode(self, values):
+        lines = []
+        # The attribute values and timestamp are the same for all fields of an asset class
+        asset_values = {}
+        for field in values:
+            if field not in self.templates:
+                continue
+            asset_class, attributes, template = self.templates[field]
+            if asset_class not in asset_values:
+                asset_values[asset_class] = (
+                    [values[att] for att in attributes],
+                    int(
+                        values[self.timestamp_field.get(asset_class) or "last_update"]
+                        * 1000000000
+                    ),
+                )
+            attribute_values, nanoepoch = asset_values[asset_class]
+            lines.append(
+                template.format(
+                    *attribute_values, value=values[field], nanoepoch=nanoepoch
+                )
             )
+        return lines
+
+    def _write(self, encoded):
+        # (v1) curl -i -XPOST 'http://localhost:8086/write?db=mydb' --data-binary
+        # 'cpu_load_short,host=server01,region=us-west value=0.64 1434055562000000000'
+        if self.auth_v2 and self.client:
+            with self.client.write_api(write_options=SYNCHRONOUS) as _client:
+                _client.write(bucket=self.bucket, record=encoded)
         else:
-            return ""
+            url = f"{'https' if self.ssl else 'http'}://{self.host}:{self.port}/write?db={self.database}"
+
+            r = self.session.post(
+                url,
+                data=encoded,
+                headers=self.headers,
+                auth=self.auth,
+                verify=self.verify_ssl,
+                timeout=self.timeout,
+            )
+
+            r.raise_for_status()
+            self.log_connection_stats()
+
+    def _trim_buffer(self):
+        # Drop the oldest points if the buffer exceeds its maximum size
+        dropped = 0
+        while len(self.buffer) > self.max_buffer:
+            self.buffer.popleft()
+            dropped += 1
+        if dropped:
+            self.dropped += dropped
+            hybridlogger.ha_log(
+                self.logger,
+                self.hass_api,
+                "WARNING",
+                f"InfluxDB write buffer is full, {dropped} points were dropped "
+                f"({self.dropped} in total).",
+            )
+
+    def _queue(self, lines):
+        with self.buffer_access:
+            self.buffer.extend(lines)
+            self._trim_buffer()
+            if len(self.buffer) >= self.batch_size:
+                self.buffer_access.notify()
+
+    def _flush_loop(self):
+        retry_delay = 0
+        while True:
+            with self.buffer_access:
+                # Wait for a full batch, the flush interval or the retry delay to expire
+                self.buffer_access.wait_for(
+                    lambda: self._stop
+                    or (not retry_delay and len(self.buffer) >= self.batch_size),
+                    timeout=retry_delay or self.flush_interval,
+                )
+                stop = self._stop
+                batch = list(islice(self.buffer, self.batch_size))
+                for _ in batch:
+                    self.buffer.popleft()
+            if batch:
+                try:
+                    self._write("".join(batch))
+                    retry_delay = 0
+                except Exception as e:
+                    hybridlogger.ha_log(
+                        self.logger,
+                        self.hass_api,
+                        "WARNING",
+                        f"Writing {len(batch)} points to influxdb failed: {e.args}",
+                    )
+                    # Put the points back and retry with an increasing delay
+                    with self.buffer_access:
+                        self.buffer.extendleft(reversed(batch))
+                        self._trim_buffer()
+                    retry_delay = min(max(retry_delay * 2, 1), self.max_backoff)
+            if stop and (retry_delay or not self.buffer):
+                if self.buffer:
+                    hybridlogger.ha_log(
+                        self.logger,
+                        self.hass_api,
+                        "WARNING",
+                        f"{len(self.buffer)} buffered points could not be written to influxdb.",
+                    )
+                return
 
     def process(self, **args):
         # Send data to influxdb
@@ -168,31 +313,16 @@ class influxdb(Plugin):
             values = msg.copy()
 
             # Build structure
-            encoded = ""
-            for field in values:
-                encoded += self._format_output(field, values)
+            lines = self._encode(values)
 
             # Influx has no tables! Use measurement prefix
             # encoded = f'inverter,plant=p1 {",".join("{}={}".format(key, value)
             # for key, value in values.items())} {nanoepoch}'
 
-            # (v1) curl -i -XPOST 'http://localhost:8086/write?db=mydb' --data-binary
-            # 'cpu_load_short,host=server01,region=us-west value=0.64 1434055562000000000'
-            if self.auth_v2 and self.client:
-                with self.client.write_api(write_options=SYNCHRONOUS) as _client:
-                    _client.write(bucket=self.bucket, record=encoded)
+            if self.write_buffer:
+                self._queue(lines)
             else:
-                url = f"{'https' if self.ssl else 'http'}://{self.host}:{self.port}/write?db={self.database}"
-
-                r = requests.post(
-                    url,
-                    data=encoded,
-                    headers=self.headers,
-                    auth=self.auth,
-                    verify=self.verify_ssl,
-                )
-
-                r.raise_for_status()
+                self._write("".join(lines))
 
         except InfluxDBError as e:
             hybridlogger.ha_log(
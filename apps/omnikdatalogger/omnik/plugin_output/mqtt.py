@@ -21,6 +21,8 @@ MEASUREMENT_CLASSES = [
 MEASUREMENT_TOTAL_INCREASING_CLASSES = ["energy", "gas", "operation_time", "count"]
 STATE_CLASS_MEASUREMENT = "measurement"
 STATE_CLASS_TOTAL_INCREASING = "total_increasing"
+# The maximum number of field sets cached per plant
+CONFIG_CACHE_SIZE = 10
 
 
 class mqtt(Plugin):
@@ -90,9 +92,38 @@ class mqtt(Plugin):
         self.topics = {}
         # Init config dict
         self.config_pl = {}
+        # Cache with the topics and config payloads per plant for each set of fields
+        self.config_cache = {}
+        # Fields that identify a device, the config payload depends on their values
+        self.identifier_fields = sorted(
+            set(self.config.attributes["identifier"].values())
+        )
+        # Only publish state and attributes when values have changed
+        self.publish_changes_only = self.config.getboolean(
+            "output.mqtt", "publish_changes_only", fallback=False
+        )
+        self.heartbeat = float(
+            self.config.get("output.mqtt", "heartbeat", fallback="300")
+        )
+        # Last published time and payload per state and attribute topic
+        self.last_published = {}
+        # Changes within the deadband of a field are not published
+        self.deadband = {}
+        self.timestamp_fields = set()
+        for field, field_config in self.config.data_field_config.items():
+            if field_config.get("deadband") is not None:
+                self.deadband[field] = float(field_config["deadband"])
+            if field_config["dev_cla"] == "timestamp":
+                self.timestamp_fields.add(field)
         # Make instance to run exclusively
         self.access = threading.Condition(threading.Lock())
         self._connected = self.mqtt_connect()
+        # Republish the unchanged states when no new messages are processed
+        self._heartbeat_job = None
+        if self.publish_changes_only and self.scheduler:
+            self._heartbeat_job = self.scheduler.every(
+                self.heartbeat, self._publish_heartbeat
+            )
 
     def mqtt_connect(self) -> bool:
         try:
@@ -111,29 +142,54 @@ class mqtt(Plugin):
             return False
 
     def _init_config(self, msg):
-        # Check if init is needed
+        # The topics and config payloads only depend on the available fields and the
+        # values of the identifiers, check if we have them cached for this plant
+        fields = frozenset(
+            field for field in msg if field in self.config.data_field_config
+        )
+        key = (fields, tuple(msg.get(field) for field in self.identifier_fields))
+        plant_cache = self.config_cache.setdefault(msg["plant_id"], {})
+        if key not in plant_cache:
+            if len(plant_cache) >= CONFIG_CACHE_SIZE:
+                # Remove the oldest entry
+                del plant_cache[next(iter(plant_cache))]
+            plant_cache[key] = self._build_config(msg, fields)
+        cached = plant_cache[key]
+
+        self.topics[msg["plant_id"]] = cached["topics"]
+        self.config_pl[msg["plant_id"]] = cached["config_pl"]
+        return cached
+
+    def _build_config(self, msg, fields):
         asset_classes = set()
-        for field in msg:
-            if field in self.config.data_field_config:
-                asset_class = self.config.data_field_config[field]["asset"]
-                if asset_class not in asset_classes:
-                    asset_classes.add(asset_class)
+        for field in fields:
+            asset_class = self.config.data_field_config[field]["asset"]
+            if asset_class not in asset_classes:
+                asset_classes.add(asset_class)
 
         # Init from using mqtt field config (loaded from json)
         # self.config.data_field_config
         # field: name, dev_cla, ic, unit, measurement, filter, asset
 
         # Assemble topics
-        self.topics[msg["plant_id"]] = self._topics(msg, asset_classes)
+        topics = self._topics(msg, asset_classes)
 
         # Assemble config
-        self.config_pl[msg["plant_id"]] = self._config_payload(
-            msg, self.topics[msg["plant_id"]], asset_classes
-        )
-
-        # Flag init as done
-        # self.mqtt_field_name_override_init[msg['plant_id']] = True
-        return asset_classes
+        config_pl = self._config_payload(msg, topics, asset_classes)
+
+        return {
+            "asset_classes": asset_classes,
+            "topics": topics,
+            "config_pl": config_pl,
+            # Serialize the config payloads once
+            "config_json": {field: json.dumps(config_pl[field]) for field in config_pl},
+            # The fields of the value payload in the order of the field config
+            "value_fields": [
+                (field, self.config.data_field_config[field]["asset"])
+                for field in self.config.data_field_config
+                if field in fields and self.config.data_field_config[field]["asset"]
+            ],
+        }
 
     def _mqtt_on_connect(self, client, userdata, flags, rc=0, properties=None):
         if rc == 0:
@@ -265,23 +321,50 @@ class mqtt(Plugin):
 
         return config_pl
 
-    def _value_payload(self, msg):
+    def _value_payload(self, msg, value_fields):
         value_pl = {}
-        # Generate MQTT config topics
-        for field in self.config.data_field_config:
-            # field: name, dev_cla, ic, unit, filter
-            # Only generate payload for available data
-            asset_class = self.config.data_field_config[field]["asset"]
-            if not asset_class:
-                # skip publication
-                continue
+        # Generate the payload for the available data
+        for field, asset_class in value_fields:
             if asset_class not in value_pl:
                 value_pl[asset_class] = {}
-            if field in msg:
-                value_pl[asset_class][field] = self.jsonval(msg[field])
+            value_pl[asset_class][field] = self.jsonval(msg[field])
 
         return value_pl
 
+    def _value_changed(self, field, last_value, value):
+        if value == last_value:
+            return False
+        if field in self.timestamp_fields:
+            # A new timestamp alone is not a change
+            return False
+        if field not in self.deadband:
+            return True
+        if not isinstance(value, (int, float)) or not isinstance(
+            last_value, (int, float)
+        ):
+            return True
+        return abs(value - last_value) > self.deadband[field]
+
+    def _changed_asset_classes(self, topics, value_pl, asset_classes):
+        # Select the asset classes with changed values or an expired heartbeat
+        now = time.time()
+        changed = set()
+        for asset_class in asset_classes:
+            topic = topics[asset_class]["state"]
+            if topic in self.last_published:
+                last_update, last_pl = self.last_published[topic]
+                if (
+                    now - last_update < self.heartbeat
+                    and last_pl.keys() == value_pl[asset_class].keys()
+                    and not any(
+                        self._value_changed(field, last_pl[field], value)
+                        for field, value in value_pl[asset_class].items()
+                    )
+                ):
+                    continue
+            changed.add(asset_class)
+        return changed
+
     def _attribute_payload(self, msg, asset_classes):
         attr_pl = {}
         for asset_class in asset_classes:
@@ -310,43 +393,28 @@ class mqtt(Plugin):
         else:
             return self.jsonval(msg[attr])
 
-    def _publish_config(self, msg):
-        new_asset_classes = set()
+    def _publish_config(self, msg, config_json):
         if msg["plant_id"] not in self.mqtt_config_published:
-            # init mqtt_config_published flag cache
-            self.mqtt_config_published[msg["plant_id"]] = set()
+            # init mqtt_config_published cache with the published config per topic
+            self.mqtt_config_published[msg["plant_id"]] = {}
+        published = self.mqtt_config_published[msg["plant_id"]]
 
-        for entity in self.config_pl[msg["plant_id"]]:
+        for entity in config_json:
             asset_class = self.config.data_field_config[entity]["asset"]
-            if (
-                asset_class in self.mqtt_config_published[msg["plant_id"]]
-                and self.mqtt_retain
-            ):
+            topic = self.topics[msg["plant_id"]][asset_class]["config"][entity]
+            if published.get(topic) == config_json[entity] and self.mqtt_retain:
                 continue
-            else:
-                self._publish_config_entity(
-                    self.topics[msg["plant_id"]][asset_class],
-                    self.config_pl[msg["plant_id"]],
-                    entity,
-                )
-                new_asset_classes.add(asset_class)
-        for item in new_asset_classes:
-            self.mqtt_config_published[msg["plant_id"]].add(item)
+            self._publish_config_entity(topic, config_json[entity])
+            published[topic] = config_json[entity]
 
-    def _publish_config_entity(self, topics, config_pl, entity):
+    def _publish_config_entity(self, topic, payload):
         # publish config
-        # asset_class = self.config.data_field_config[entity]['asset']
-        if not self.mqtt_client.publish(
-            topics["config"][entity],
-            json.dumps(config_pl[entity]),
-            retain=self.mqtt_retain,
-        ):
+        if not self.mqtt_client.publish(topic, payload, retain=self.mqtt_retain):
             hybridlogger.ha_log(
                 self.logger,
                 self.hass_api,
                 "WARNING",
-                f"Publishing config {json.dumps(config_pl[entity])} "
-                f"to {topics['config'][entity]} failed!",
+                f"Publishing config {payload} to {topic} failed!",
             )
 
     def _publish_attributes(self, msg, asset_classes):
@@ -354,27 +422,35 @@ class mqtt(Plugin):
         attr_pl = self._attribute_payload(msg, asset_classes)
         for asset_class in asset_classes:
             # publish attributes
-            if not self.mqtt_client.publish(
-                self.topics[msg["plant_id"]][asset_class]["attr"],
+            topic = self.topics[msg["plant_id"]][asset_class]["attr"]
+            if self.mqtt_client.publish(
+                topic,
                 json.dumps(attr_pl[asset_class]),
                 retain=self.mqtt_retain,
             ):
+                self.last_published[topic] = (time.time(), attr_pl[asset_class])
+            else:
                 hybridlogger.ha_log(
                     self.logger,
                     self.hass_api,
                     "WARNING",
                     f"Publishing attributes {json.dumps(attr_pl[asset_class])} to "
-                    f"{self.topics[msg['plant_id']][asset_class]['attr']} failed!",
+                    f"{topic} failed!",
                 )
 
     def _publish_state(self, topics, value_pl, asset_classes):
         for asset_class in asset_classes:
             # publish state
-            if not self.mqtt_client.publish(
+            if self.mqtt_client.publish(
                 topics[asset_class]["state"],
                 json.dumps(value_pl[asset_class]),
                 retain=self.mqtt_retain,
             ):
+                self.last_published[topics[asset_class]["state"]] = (
+                    time.time(),
+                    value_pl[asset_class],
+                )
+            else:
                 hybridlogger.ha_log(
                     self.logger,
                     self.hass_api,
@@ -383,6 +459,23 @@ class mqtt(Plugin):
                     f"{topics[asset_class]['state']} failed!",
                 )
 
+    def _publish_heartbeat(self):
+        if not self._connected:
+            return
+        now = time.time()
+        with self.access:
+            for topic, (last_update, last_pl) in self.last_published.items():
+                if now - last_update < self.heartbeat:
+                    continue
+                if self.mqtt_client.publish(
+                    topic, json.dumps(last_pl), retain=self.mqtt_retain
+                ):
+                    self.last_published[topic] = (now, last_pl)
+
+    def terminate(self):
+        if self._heartbeat_job:
+            self._heartbeat_job.cancel()
+
     def process(self, **args):
         """
         Send data to over mqtt (compliant with Home Assistant MQTT discovery standard
@@ -395,24 +488,27 @@ class mqtt(Plugin):
             if not self._connected:
                 return
 
-        self.access.acquire()
+        with self.access:
+            # Get argument
+            msg = args["msg"]
+            # Log output fields
+            self.log_available_fields(msg)
 
-        # Get argument
-        msg = args["msg"]
-        # Log output fields
-        self.log_available_fields(msg)
+            # Assemble config
+            cached = self._init_config(msg)
+            asset_classes = cached["asset_classes"]
 
-        # Assemble config
-        asset_classes = self._init_config(msg)
+            # Publish config
+            self._publish_config(msg, cached["config_json"])
 
-        # Publish config
-        self._publish_config(msg)
-
-        # publish attributes
-        self._publish_attributes(msg, asset_classes)
+            value_pl = self._value_payload(msg, cached["value_fields"])
+            if self.publish_changes_only:
+                asset_classes = self._changed_asset_classes(
+                    self.topics[msg["plant_id"]], value_pl, asset_classes
+                )
 
-        # publish state
-        value_pl = self._value_payload(msg)
-        self._publish_state(self.topics[msg["plant_id"]], value_pl, asset_classes)
+            # publish attributes
+            self._publish_attributes(msg, asset_classes)
 
-        self.access.release()
+            # publish state
+            self._publish_state(self.topics[msg["plant_id"]], value_pl, asset_classes)
@@ -18,6 +18,11 @@ class pvoutput(Plugin):
         self.process_aggregates = True
         # Make instance to run exclusively
         self.access = threading.Condition(threading.Lock())
+        # Keep the connection to pvoutput.org alive between updates
+        self.init_session("output.pvoutput")
+
+    def terminate(self):
+        self.close_session()
 
     def _get_temperature(self, msg, data):
         if self.config.getboolean(
@@ -154,13 +159,15 @@ class pvoutput(Plugin):
 
             self.logger.debug(json.dumps(data, indent=2))
 
-            r = requests.post(
+            r = self.session.post(
                 "https://pvoutput.org/service/r2/addstatus.jsp",
                 data=encoded,
                 headers=headers,
+                timeout=self.timeout,
             )
 
             r.raise_for_status()
+            self.log_connection_stats()
             hybridlogger.ha_log(
                 self.logger, self.hass_api, "DEBUG", f"pvoutput upload: {data}"
             )
@@ -0,0 +1,70 @@
+"""Compact records for the DSMR telegrams that are kept in the DSMR history."""
+
+from collections.abc import Mapping
+
+# The maximum number of field orders for which the field index is shared
+MAX_SHARED_INDEXES = 64
+
+
+class SampleRecord(Mapping):
+    """
+    A read only sample that keeps the fields in insertion order.
+    Records with the same fields share one field index, a record only holds a tuple with its values.
+    copy() returns a plain dict that can be changed.
+    """
+
+    __slots__ = ("_index", "_values")
+    _indexes = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._indexes = {}
+
+    def __init__(self, data=()):
+        if not isinstance(data, dict):
+            data = dict(data)
+        fields = tuple(data)
+        index = self._indexes.get(fields)
+        if index is None:
+            index = {field: position for position, field in enumerate(fields)}
+            if len(self._indexes) < MAX_SHARED_INDEXES:
+                self._indexes[fields] = index
+        self._index = index
+        self._values = tuple(data.values())
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.copy()})"
+
+    def get(self, key, default=None):
+        position = self._index.get(key)
+        if position is None:
+            return default
+        return self._values[position]
+
+    def items(self):
+        return zip(self._index, self._values)
+
+    def values(self):
+        return self._values
+
+    def copy(self):
+        """Return a plain dict with the fields of the record."""
+        return dict(zip(self._index, self._values))
+
+
+class DsmrSample(SampleRecord):
+    """A DSMR telegram, as shared by the DSMR history and the output plugins."""
+
+    __slots__ = ()
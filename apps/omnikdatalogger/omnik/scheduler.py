@@ -0,0 +1,143 @@
+"""Run timed jobs from a single thread."""
+
+import heapq
+import itertools
+import threading
+from collections import deque
+from time import monotonic
+
+from omnik.ha_logger import hybridlogger
+
+
+class Job(object):
+    """A scheduled call, repeated every interval seconds if an interval is set."""
+
+    def __init__(self, due, callback, args, interval=None):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler(object):
+    """
+    Keep the jobs in a heap ordered by due time and run them in one worker thread.
+    Jobs should be short, a job that blocks delays all other jobs.
+    """
+
+    def __init__(self, logger, hass_api, name="scheduler"):
+        self.logger = logger
+        self.hass_api = hass_api
+        self._heap = []
+        self._sequence = itertools.count()
+        self.access = threading.Condition(threading.Lock())
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay, callback, *args):
+        """Call callback(*args) after delay seconds. Returns the job."""
+        return self._push(Job(monotonic() + delay, callback, args))
+
+    def every(self, interval, callback, *args):
+        """Call callback(*args) every interval seconds. Returns the job."""
+        return self._push(Job(monotonic() + interval, callback, args, interval))
+
+    def _push(self, job):
+        with self.access:
+            heapq.heappush(self._heap, (job.due, next(self._sequence), job))
+            self.access.notify()
+        return job
+
+    def _next_job(self):
+        # Wait for the first job that is due, returns None when stopping
+        with self.access:
+            while not self._stop:
+                if self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+                timeout = self._heap[0][0] - monotonic() if self._heap else None
+                if timeout is not None and timeout <= 0:
+                    return heapq.heappop(self._heap)[2]
+                self.access.wait(timeout)
+            return None
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if not job:
+                return
+            try:
+                job.callback(*job.args)
+            except Exception as e:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "ERROR",
+                    f"Scheduled job {job.callback.__name__} failed. Error: {e!r}",
+                )
+            if job.interval and not job.cancelled:
+                # Skip the runs that were missed while the job was running
+                job.due = max(job.due + job.interval, monotonic())
+                self._push(job)
+
+    def stop(self, timeout=None):
+        """Stop running jobs, a running job is waited for at most timeout seconds."""
+        with self.access:
+            self._stop = True
+            self._heap.clear()
+            self.access.notify()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+
+class Worker(object):
+    """
+    Run submitted calls one after another in a long lived thread.
+    Scheduler jobs can submit a blocking call here to keep the scheduler free.
+    """
+
+    def __init__(self, logger, hass_api, name="worker"):
+        self.logger = logger
+        self.hass_api = hass_api
+        self.queue = deque()
+        self.access = threading.Condition(threading.Lock())
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, callback, *args):
+        """Queue callback(*args), calls submitted after stop() are ignored."""
+        with self.access:
+            if not self._stop:
+                self.queue.append((callback, args))
+                self.access.notify()
+
+    def _run(self):
+        while True:
+            with self.access:
+                self.access.wait_for(lambda: self.queue or self._stop)
+                if not self.queue:
+                    return
+                callback, args = self.queue.popleft()
+            try:
+                callback(*args)
+            except Exception as e:
+                hybridlogger.ha_log(
+                    self.logger,
+                    self.hass_api,
+                    "ERROR",
+                    f"Call {callback.__name__} failed. Error: {e!r}",
+                )
+
+    def stop(self, timeout=None):
+        """Run the queued calls and stop, the worker is waited for at most timeout seconds."""
+        with self.access:
+            self._stop = True
+            self.access.notify()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
@@ -159,7 +159,7 @@ class HA_OmnikDataLogger(hass.Hass):
 
     def terminate(self):
         hybridlogger.ha_log(logger, self, "INFO", "Stopping Omnikdatalogger...")
-        self.rt.stop()
+        self.rt.stop(self.datalogger.fetch_timeout)
         self.datalogger.terminate()
         hybridlogger.ha_log(logger, self, "INFO", "Omnikdatalogger was stopped")
 
@@ -199,7 +199,7 @@ def main(c: ha_ConfigParser, hass_api=None):
             except KeyboardInterrupt:
                 pass
             hybridlogger.ha_log(logger, hass_api, "INFO", "Stopping Omnikdatalogger...")
-            rt.stop()
+            rt.stop(datalogger.fetch_timeout)
             datalogger.terminate()
             hybridlogger.ha_log(logger, hass_api, "INFO", "Omnikdatalogger was stopped")
 
@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+"""Micro benchmark for the Decimal processing of a DSMR telegram.
+
+The measured values are kept as Decimal. A float numeric mode was measured with this benchmark
+and was not adopted: processing a V5 telegram took 21.8 - 22.7 µs in float mode against
+19.8 - 20.5 µs with Decimal, and the time including the output conversion was equal within noise.
+dsmr_parser yields Decimal values, so a float mode first pays for converting them.
+This benchmark measures the Decimal processing, the processing with the output conversion
+and the conversion of the parsed values to float that a float mode would add.
+Run from the repository root: python scripts/benchmark/dsmr_numeric.py
+"""
+
+import os
+import sys
+import threading
+import timeit
+from decimal import Decimal
+
+from dsmr_parser import telegram_specifications
+from dsmr_parser.parsers import TelegramParser
+
+from sample_records import TELEGRAM_V5, TERMINAL, dsmr_processor, process
+
+APP_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "apps", "omnikdatalogger"
+)
+sys.path.insert(0, APP_PATH)
+
+from omnik.plugin_output import Plugin  # noqa: E402
+
+
+def process_and_output(dsmr, telegram):
+    # The values are converted by every output plugin
+    return {
+        field: Plugin.jsonval(None, value)
+        for field, value in process(dsmr, telegram).items()
+    }
+
+
+def float_values(telegram):
+    # The conversion of the parsed values a float mode needs before processing
+    return [
+        float(cosem.value)
+        for cosem in telegram.values()
+        if isinstance(getattr(cosem, "value", None), Decimal)
+    ]
+
+
+def benchmark(function, number):
+    seconds = min(timeit.repeat(function, number=number, repeat=7))
+    return seconds / number * 1e6
+
+
+def main():
+    # The DSRM processing methods look up the terminal by the thread name
+    threading.current_thread().name = TERMINAL
+    parser = TelegramParser(telegram_specifications.V5, apply_checksum_validation=False)
+    telegram = parser.parse(TELEGRAM_V5)
+    dsmr = dsmr_processor()
+
+    number = 5000
+    for name, function in [
+        ("processing", lambda: process(dsmr, telegram)),
+        ("with output", lambda: process_and_output(dsmr, telegram)),
+        ("to float", lambda: float_values(telegram)),
+    ]:
+        print(f"{name:>12}: {benchmark(function, number):8.1f} µs/telegram")
+
+
+if __name__ == "__main__":
+    main()
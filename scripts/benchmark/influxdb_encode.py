@@ -0,0 +1,124 @@
+#! /usr/bin/env python3
+"""Micro benchmark for encoding a message in the InfluxDB line protocol.
+
+The legacy encoder rebuilds the attribute and tag dicts for every field of every message.
+The influxdb plugin now uses line protocol templates that are compiled once per field.
+Run from the repository root: python scripts/benchmark/influxdb_encode.py
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+import timeit
+import types
+from decimal import Decimal
+
+APP_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "apps", "omnikdatalogger"
+)
+sys.path.insert(0, APP_PATH)
+
+from omniklogger import ha_ConfigParser  # noqa: E402
+from omnik.datalogger import DataLogger  # noqa: E402
+from omnik.plugin_output import Plugin  # noqa: E402
+
+
+def legacy_get_attributes(plugin, values, asset_class):
+    attributes = {}
+    for att in plugin.config.attributes["asset"][asset_class]:
+        if att in plugin.config.data_field_config:
+            if plugin.config.data_field_config[att]["dev_cla"] == "timestamp":
+                continue
+        attributes[att] = values[att]
+    return attributes.copy()
+
+
+def legacy_get_tags(plugin, field, attributes, asset_class):
+    field_config = plugin.config.data_field_config[field]
+    tags = attributes.copy()
+    tags["asset"] = asset_class
+    tags["entity"] = field
+    tags["name"] = str(field_config["name"]).replace(" ", "\\ ")
+    if field_config["dev_cla"]:
+        tags["dev_cla"] = field_config["dev_cla"]
+    if field_config["unit"]:
+        tags["unit"] = str(field_config["unit"]).replace(" ", "\\ ")
+    tags.update(field_config["tags"])
+    return tags.copy()
+
+
+def legacy_encode(plugin, values):
+    # The dict based implementation of the influxdb plugin used before version 1.15
+    encoded = ""
+    for field in values:
+        if field not in plugin.config.data_field_config:
+            continue
+        field_config = plugin.config.data_field_config[field]
+        if not field_config["measurement"] or field_config["dev_cla"] == "timestamp":
+            continue
+        asset_class = field_config["asset"]
+        attributes = legacy_get_attributes(plugin, values, asset_class)
+        nanoepoch = int(
+            values[plugin.timestamp_field.get(asset_class) or "last_update"]
+            * 1000000000
+        )
+        tags = legacy_get_tags(plugin, field, attributes, asset_class)
+        encoded += (
+            f'{field_config["measurement"]},'
+            f'{",".join("{}={}".format(key, value) for key, value in tags.items())} '
+            f"value={values[field]} {nanoepoch}\n"
+        )
+    return encoded
+
+
+def sample_message(config):
+    # A combined inverter and DSMR message with a value for every field
+    now = time.time()
+    msg = {
+        "plant_id": "123",
+        "inverter": "NLDN1234567890AB",
+        "EQUIPMENT_IDENTIFIER": "4530303331303033303031363939353135",
+        "EQUIPMENT_IDENTIFIER_GAS": "4730303139333430323231313938343135",
+    }
+    for field, field_config in config.data_field_config.items():
+        if field in msg or field_config["asset"] == "openweather":
+            continue
+        if field_config["dev_cla"] == "timestamp":
+            msg[field] = now
+        else:
+            msg[field] = Decimal("1234.567")
+    return msg
+
+
+def main():
+    config = ha_ConfigParser(ha_args={"output.influxdb": {"database": "benchmark"}})
+    with open(os.path.join(APP_PATH, "data_fields.json")) as json_file_config:
+        config.data_field_config = json.load(json_file_config)
+    DataLogger._init_attribute_dict(types.SimpleNamespace(config=config))
+    Plugin.config = config
+    Plugin.logger = logging.getLogger("benchmark")
+    # Importing the module registers an instance of the plugin
+    import omnik.plugin_output.influxdb  # noqa: F401
+
+    plugin = Plugin.plugins[-1]
+    msg = sample_message(config)
+
+    # Both encoders must produce the same output
+    assert "".join(plugin._encode(msg)) == legacy_encode(plugin, msg)
+
+    number = 2000
+    for name, encode in [
+        ("legacy", lambda: legacy_encode(plugin, msg)),
+        ("compiled", lambda: "".join(plugin._encode(msg))),
+    ]:
+        seconds = min(timeit.repeat(encode, number=number, repeat=5))
+        print(
+            f"{name:>10}: {seconds / number * 1e6:8.1f} µs/message ({len(msg)} fields)"
+        )
+    plugin.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+"""Micro benchmark for decoding inverter messages with InverterMsg.FetchDataDict.
+
+The legacy decoder calls a getter (and struct.unpack) for every field.
+Run from the repository root: python scripts/benchmark/inverter_msg_decode.py
+"""
+
+import os
+import random
+import struct
+import sys
+import timeit
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "..", "apps", "omnikdatalogger")
+)
+
+from omnik.InverterMsg import InverterMsg, decode_frames, numpy  # noqa: E402
+
+
+def legacy_fetch_data_dict(msg, data):
+    # The getter based implementation of FetchDataDict used before version 1.15
+    data["last_update_time"] = "n/a"
+    data["last_update"] = msg.last_update
+    data["inverter"] = msg.getID()
+    data["current_power"] = msg.getPower()
+    data["today_energy"] = msg.getEToday()
+    data["total_energy"] = msg.getETotal()
+    data["inverter_temperature"] = msg.getTemp()
+    for i in [1, 2, 3]:
+        msg.setIfValid(f"current_ac{i}", data, msg.getIACalt(i))
+    for i in [1, 2, 3]:
+        msg.setIfValid(f"voltage_ac{i}", data, msg.getVAC(i))
+    for i in [1, 2, 3]:
+        msg.setIfValid(f"frequency_ac{i}", data, msg.getFAC(i))
+    for i in [1, 2, 3]:
+        msg.setIfValid(f"power_ac{i}", data, msg.getPAC(i))
+    for i in [1, 2, 3]:
+        msg.setIfValid(f"voltage_pv{i}", data, msg.getVPV(i))
+    for i in [1, 2, 3]:
+        msg.setIfValid(f"current_pv{i}", data, msg.getIPV(i))
+    for i in [1, 2, 3]:
+        msg.setIfValid(f"power_pv{i}", data, msg.getPPV(i))
+    msg.setIfValid("operation_hours", data, msg.getHTotal())
+    msg.setIfValid("current_power_pv", data, msg.getPVPower())
+    msg.setIfValid(
+        "voltage_ac_max",
+        data,
+        msg._maxoflist([msg.getVAC(1), msg.getVAC(2), msg.getVAC(3)]),
+    )
+    return data
+
+
+def random_frame():
+    frame = bytearray(128)
+    frame[0:4] = b"\x68\x7d\x41\xb0"
+    frame[15:31] = b"NLDN%012d" % random.randrange(10**12)
+    shorts = [random.choice([65535, random.randrange(0, 6000)]) for _ in range(20)]
+    struct.pack_into("!20H", frame, 31, *shorts)
+    struct.pack_into("!II", frame, 71, random.randrange(10**7), random.randrange(10**5))
+    return bytes(frame)
+
+
+def main():
+    frames = [random_frame() for _ in range(1000)]
+    # Validate the output is equal
+    for frame in frames:
+        msg = InverterMsg(frame)
+        data = {"plant_id": "1"}
+        msg.FetchDataDict(data)
+        data["last_update_time"] = "n/a"
+        assert data == legacy_fetch_data_dict(msg, {"plant_id": "1"}), frame
+        assert list(data) == list(legacy_fetch_data_dict(msg, {"plant_id": "1"}))
+
+    number = 20
+    legacy = timeit.timeit(
+        lambda: [
+            legacy_fetch_data_dict(InverterMsg(f), {"plant_id": "1"}) for f in frames
+        ],
+        number=number,
+    )
+    single_pass = timeit.timeit(
+        lambda: [InverterMsg(f).FetchDataDict({"plant_id": "1"}) for f in frames],
+        number=number,
+    )
+    count = number * len(frames)
+    print(f"legacy getters : {legacy / count * 1e6:8.2f} us/message")
+    print(f"single pass    : {single_pass / count * 1e6:8.2f} us/message")
+    print(f"speedup        : {legacy / single_pass:8.2f}x")
+    if numpy is None:
+        print("NumPy is not installed, skipping the batch decoder")
+        return
+    buffer = b"".join(frames)
+    batch = timeit.timeit(lambda: decode_frames(buffer), number=number)
+    print(f"batch (NumPy)  : {batch / count * 1e6:8.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+"""Micro benchmark for the memory and CPU per DSMR telegram kept as dict or as sample record.
+
+The DSRM processing builds a dict, the datalogger keeps it as a read only DsmrSample record.
+Run from the repository root: python scripts/benchmark/sample_records.py
+"""
+
+import logging
+import os
+import sys
+import threading
+import timeit
+import tracemalloc
+from decimal import Decimal
+
+from dsmr_parser import telegram_specifications
+from dsmr_parser.parsers import TelegramParser
+
+APP_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "apps", "omnikdatalogger"
+)
+sys.path.insert(0, APP_PATH)
+
+from omnik.dsmr import DSRM  # noqa: E402
+from omnik.records import DsmrSample  # noqa: E402
+
+TERMINAL = "benchmark"
+
+TELEGRAM_V5 = (
+    "/ISk5\\2MT382-1000\r\n"
+    "\r\n"
+    "1-3:0.2.8(50)\r\n"
+    "0-0:1.0.0(170102192002W)\r\n"
+    "0-0:96.1.1(4B384547303034303436333935353037)\r\n"
+    "1-0:1.8.1(000004.426*kWh)\r\n"
+    "1-0:1.8.2(000002.399*kWh)\r\n"
+    "1-0:2.8.1(000002.444*kWh)\r\n"
+    "1-0:2.8.2(000000.000*kWh)\r\n"
+    "0-0:96.14.0(0002)\r\n"
+    "1-0:1.7.0(00.244*kW)\r\n"
+    "1-0:2.7.0(00.000*kW)\r\n"
+    "0-0:96.7.21(00013)\r\n"
+    "0-0:96.7.9(00000)\r\n"
+    "1-0:99.97.0(0)(0-0:96.7.19)\r\n"
+    "1-0:32.32.0(00000)\r\n"
+    "1-0:52.32.0(00000)\r\n"
+    "1-0:72.32.0(00000)\r\n"
+    "1-0:32.36.0(00000)\r\n"
+    "1-0:52.36.0(00000)\r\n"
+    "1-0:72.36.0(00000)\r\n"
+    "0-0:96.13.0()\r\n"
+    "1-0:32.7.0(0230.0*V)\r\n"
+    "1-0:52.7.0(0230.0*V)\r\n"
+    "1-0:72.7.0(0229.0*V)\r\n"
+    "1-0:31.7.0(0.48*A)\r\n"
+    "1-0:51.7.0(0.44*A)\r\n"
+    "1-0:71.7.0(0.86*A)\r\n"
+    "1-0:21.7.0(00.070*kW)\r\n"
+    "1-0:41.7.0(00.032*kW)\r\n"
+    "1-0:61.7.0(00.142*kW)\r\n"
+    "1-0:22.7.0(00.000*kW)\r\n"
+    "1-0:42.7.0(00.000*kW)\r\n"
+    "1-0:62.7.0(00.000*kW)\r\n"
+    "0-1:24.1.0(003)\r\n"
+    "0-1:96.1.0(3232323241424344313233343536373839)\r\n"
+    "0-1:24.2.1(170102161005W)(00000.107*m3)\r\n"
+    "!6EEE\r\n"
+)
+
+
+def dsmr_processor():
+    # A DSRM instance with the configuration of one terminal, no terminal is started
+    dsmr = DSRM()
+    dsmr.logger = logging.getLogger("benchmark")
+    dsmr.tconfig = {
+        "tarif": {"0001": "low", "0002": "normal"},
+        TERMINAL: {"dsmr_version": "5", "gas_meter": True},
+    }
+    dsmr.last_gas_update = {TERMINAL: [0, Decimal("0"), Decimal("0")]}
+    return dsmr
+
+
+# The number of telegrams kept, like the DSMR history of several meters
+KEPT = 1000
+
+
+def process(dsmr, telegram):
+    msg_dsmr = {}
+    dsmr._process_power_details(msg_dsmr, telegram)
+    dsmr._process_gas(msg_dsmr, telegram)
+    return msg_dsmr
+
+
+def process_and_keep(dsmr, telegram):
+    # The datalogger keeps the processed telegram as a record
+    return DsmrSample(process(dsmr, telegram))
+
+
+def memory(function):
+    tracemalloc.start()
+    kept = [function() for _ in range(KEPT)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(kept)
+
+
+def main():
+    # The DSRM processing methods look up the terminal by the thread name
+    threading.current_thread().name = TERMINAL
+    parser = TelegramParser(telegram_specifications.V5, apply_checksum_validation=False)
+    telegram = parser.parse(TELEGRAM_V5)
+    dsmr = dsmr_processor()
+
+    number = 5000
+    for name, function in [
+        ("dict", lambda: process(dsmr, telegram)),
+        ("record", lambda: process_and_keep(dsmr, telegram)),
+    ]:
+        msg_dsmr = function()
+        seconds = min(timeit.repeat(function, number=number, repeat=7))
+        print(
+            f"{name:>10}: {seconds / number * 1e6:8.1f} µs/telegram, "
+            f"{memory(function):7.0f} bytes/telegram kept "
+            f"({len(msg_dsmr)} fields)"
+        )
+    # Both must hold the same values in the same order
+    record = process_and_keep(dsmr, telegram)
+    assert record == process(dsmr, telegram)
+    assert list(record) == list(process(dsmr, telegram))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The omnik package is not installed, it is loaded from the app folder
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "apps", "omnikdatalogger")
+)
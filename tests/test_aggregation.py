@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from omnik.aggregation import AggregatedData, AggregationPlan
+
+
+def aggregate(plan, *datas):
+    aggregated = AggregatedData()
+    for data in datas:
+        plan.add(aggregated, data)
+    return aggregated
+
+
+def test_defaults_without_aggregate_keys():
+    # A user copy of data_fields.json without aggregate keys
+    plan = AggregationPlan({"current_power": {"name": "Current power"}})
+    aggregated = aggregate(
+        plan,
+        {
+            "current_power": Decimal("100"),
+            "total_energy": Decimal("10.5"),
+            "voltage_ac1": Decimal("230.1"),
+            "timestamp": 1,
+        },
+        {
+            "current_power": Decimal("50"),
+            "total_energy": Decimal("1.5"),
+            "voltage_ac1": Decimal("231.0"),
+            "timestamp": 2,
+        },
+    )
+    assert aggregated == {
+        "current_power": Decimal("150"),
+        "total_energy": Decimal("12.0"),
+        "voltage_ac1": Decimal("231.0"),
+        "timestamp": 2,
+    }
+
+
+def test_max_and_sum_start_at_zero():
+    plan = AggregationPlan({})
+    aggregated = aggregate(
+        plan,
+        {"inverter_temperature": Decimal("-5.2"), "current_net_power": Decimal("-300")},
+        {"inverter_temperature": Decimal("-3.1"), "current_net_power": Decimal("100")},
+    )
+    assert aggregated["inverter_temperature"] == Decimal("0")
+    assert aggregated["current_net_power"] == Decimal("-200")
+
+
+def test_aggregate_key_overrides_default():
+    plan = AggregationPlan(
+        {
+            "inverter_temperature": {"aggregate": "mean"},
+            "current_power": {"aggregate": None},
+            "custom_field": {"aggregate": "min"},
+        }
+    )
+    aggregated = aggregate(
+        plan,
+        {
+            "inverter_temperature": Decimal("20"),
+            "current_power": Decimal("100"),
+            "custom_field": Decimal("3"),
+        },
+        {
+            "inverter_temperature": Decimal("30"),
+            "current_power": Decimal("50"),
+            "custom_field": Decimal("-1"),
+        },
+    )
+    assert aggregated == {
+        "inverter_temperature": Decimal("25"),
+        "custom_field": Decimal("-1"),
+    }
+    assert aggregated.counts == {"inverter_temperature": 2}
+
+
+def test_unknown_operator_is_reported():
+    plan = AggregationPlan({"current_power": {"aggregate": "median"}})
+    assert plan.invalid == {"current_power": "median"}
+    assert "current_power" not in plan.sum_fields
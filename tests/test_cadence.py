@@ -0,0 +1,43 @@
+import pytest
+
+from omnik.cadence import PlantCadence, ReportCadence
+
+
+def observe(cadence, reports):
+    for report in reports:
+        cadence.observe(report)
+    return cadence
+
+
+def test_configured_period_is_first_guess():
+    cadence = observe(PlantCadence(360), [1000.0, 1600.0])
+    assert not cadence.ready
+    assert cadence.next_report(1700.0, 10) is None
+
+
+def test_learns_period_longer_than_configured():
+    cadence = observe(PlantCadence(360), [1000.0 + 600 * n for n in range(6)])
+    assert cadence.ready
+    assert cadence.period == pytest.approx(600)
+    assert cadence.next_report(4100.0, 10) == pytest.approx(4600)
+
+
+def test_learns_period_shorter_than_configured():
+    cadence = observe(PlantCadence(600), [1000.0 + 300 * n for n in range(6)])
+    assert cadence.period == pytest.approx(300)
+
+
+def test_missed_reports_and_jitter():
+    reports = [1000.0, 1601.0, 2199.0, 3400.0, 4001.0, 5800.0, 6399.0]
+    cadence = observe(PlantCadence(360), reports)
+    assert cadence.period == pytest.approx(600, abs=2)
+
+
+def test_next_poll_after_expected_report():
+    cadence = ReportCadence(360, 10)
+    assert cadence.next_poll(0.0) is None
+    for n in range(4):
+        cadence.observe("p1", 1000.0 + 600 * n)
+    assert cadence.next_poll(2900.0) == pytest.approx(2800 + 600 + 10)
+    cadence.early_poll("p1")
+    assert cadence.stats()["p1"]["early_polls"] == 1
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from omnik.dsmr.coalesce import COALESCE_FIELDS, TelegramCoalescer
+
+
+def telegram(timestamp, power, power_l1=None):
+    msg_dsmr = {"timestamp": timestamp, "current_net_power": Decimal(power)}
+    if power_l1 is not None:
+        msg_dsmr["current_net_power_l1"] = Decimal(power_l1)
+    return msg_dsmr
+
+
+def test_window_statistics():
+    coalescer = TelegramCoalescer(10)
+    assert coalescer.add(telegram(100, 100)) is None
+    assert coalescer.add(telegram(102, 300)) is None
+    assert coalescer.add(telegram(108, -200)) is None
+    coalesced = coalescer.add(telegram(110, 50))
+    # The latest telegram is forwarded with the statistics of the window
+    assert coalesced["timestamp"] == 110
+    assert coalesced["current_net_power"] == Decimal(50)
+    assert coalesced["current_net_power_min"] == Decimal(-200)
+    assert coalesced["current_net_power_max"] == Decimal(300)
+    # Time weighted: 100 for 2s, 300 for 6s and -200 for 2s
+    assert coalesced["current_net_power_avg"] == Decimal(160)
+
+
+def test_next_window_starts_with_last_telegram():
+    coalescer = TelegramCoalescer(10)
+    coalescer.add(telegram(100, 100))
+    coalescer.add(telegram(110, 500))
+    assert coalescer.add(telegram(115, 200)) is None
+    coalesced = coalescer.add(telegram(120, 200))
+    assert coalesced["current_net_power_min"] == Decimal(200)
+    assert coalesced["current_net_power_max"] == Decimal(500)
+    assert coalesced["current_net_power_avg"] == Decimal(350)
+
+
+def test_fase_power_statistics():
+    assert "current_net_power_l1" in COALESCE_FIELDS
+    coalescer = TelegramCoalescer(10)
+    coalescer.add(telegram(100, 100, 40))
+    coalesced = coalescer.add(telegram(110, 100, 60))
+    assert coalesced["current_net_power_l1_min"] == Decimal(40)
+    assert coalesced["current_net_power_l1_max"] == Decimal(60)
+    assert coalesced["current_net_power_l1_avg"] == Decimal(40)
+    # Fields that are not in the telegram get no statistics
+    assert "current_net_power_l2_min" not in coalesced
+
+
+def test_configured_fields():
+    coalescer = TelegramCoalescer(10, ["current_net_power_l1"])
+    coalescer.add(telegram(100, 100, 40))
+    coalesced = coalescer.add(telegram(110, 100, 60))
+    assert "current_net_power_min" not in coalesced
+    assert coalesced["current_net_power_l1_max"] == Decimal(60)
+
+
+def test_flush_waits_for_interval():
+    coalescer = TelegramCoalescer(10)
+    coalescer.add(telegram(100, 100))
+    coalescer.add(telegram(102, 300))
+    # A telegram was received just now
+    assert coalescer.flush() is None
+    coalescer.received -= 10
+    coalesced = coalescer.flush()
+    assert coalesced["current_net_power"] == Decimal(300)
+    assert coalesced["current_net_power_max"] == Decimal(300)
+    assert coalescer.flush() is None
+
+
+def test_average_keeps_decimals_of_field():
+    coalescer = TelegramCoalescer(10, ["INSTANTANEOUS_VOLTAGE_L1"])
+    coalescer.add({"timestamp": 100, "INSTANTANEOUS_VOLTAGE_L1": Decimal("230.1")})
+    coalescer.add({"timestamp": 103, "INSTANTANEOUS_VOLTAGE_L1": Decimal("229.0")})
+    coalesced = coalescer.add(
+        {"timestamp": 110, "INSTANTANEOUS_VOLTAGE_L1": Decimal("231.0")}
+    )
+    # Time weighted: 230.1 for 3s and 229.0 for 7s
+    assert coalesced["INSTANTANEOUS_VOLTAGE_L1_avg"] == Decimal("229.3")
+    assert coalesced["INSTANTANEOUS_VOLTAGE_L1_avg"].as_tuple().exponent == -1
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+
+from omnik.dispatcher import (
+    OutputWorker,
+    OVERFLOW_BLOCK,
+    OVERFLOW_COALESCE,
+    OVERFLOW_DROP_OLDEST,
+)
+
+
+class Plugin(object):
+    name = "test"
+
+    def __init__(self):
+        self.messages = []
+        self.release = threading.Event()
+
+    def process(self, msg):
+        self.release.wait(5)
+        self.messages.append(msg)
+
+
+def worker(plugin, overflow, queue_size=2):
+    return OutputWorker(plugin, queue_size, overflow, logging.getLogger("test"), None)
+
+
+def fill(output, *plants):
+    # The first message is taken by the worker, it waits in process
+    output.put({"plant_id": "first"})
+    while output.stats()["queue_depth"]:
+        time.sleep(0.01)
+    for plant in plants:
+        output.put({"plant_id": plant})
+
+
+def test_messages_processed_in_order():
+    plugin = Plugin()
+    plugin.release.set()
+    output = worker(plugin, OVERFLOW_BLOCK)
+    for value in range(5):
+        output.put({"plant_id": "p1", "value": value})
+    output.terminate(5)
+    assert [msg["value"] for msg in plugin.messages] == list(range(5))
+    assert output.stats()["processed"] == 5
+
+
+def test_put_makes_snapshot():
+    plugin = Plugin()
+    output = worker(plugin, OVERFLOW_BLOCK)
+    data = {"plant_id": "p1", "value": 1}
+    output.put(data)
+    data["value"] = 2
+    plugin.release.set()
+    output.terminate(5)
+    assert plugin.messages == [{"plant_id": "p1", "value": 1}]
+
+
+def test_drop_oldest():
+    plugin = Plugin()
+    output = worker(plugin, OVERFLOW_DROP_OLDEST)
+    fill(output, "p1", "p2", "p3")
+    plugin.release.set()
+    output.terminate(5)
+    assert [msg["plant_id"] for msg in plugin.messages] == ["first", "p2", "p3"]
+    assert output.stats()["dropped"] == 1
+
+
+def test_coalesce_same_plant():
+    plugin = Plugin()
+    output = worker(plugin, OVERFLOW_COALESCE)
+    fill(output, "p1", "p2", "p1")
+    plugin.release.set()
+    output.terminate(5)
+    assert [msg["plant_id"] for msg in plugin.messages] == ["first", "p1", "p2"]
+    assert output.stats()["coalesced"] == 1
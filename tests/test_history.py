@@ -0,0 +1,63 @@
+from decimal import Decimal
+
+from omnik.dsmr.history import TelegramHistory
+from omnik.records import DsmrSample
+
+
+def message(timestamp, energy, tariff="low"):
+    return DsmrSample(
+        {"timestamp": timestamp, "energy_used_net": Decimal(energy), "tariff": tariff}
+    )
+
+
+def history(*messages, depth=10):
+    telegrams = TelegramHistory(depth)
+    for msg in messages:
+        telegrams.append(msg)
+    return telegrams
+
+
+def test_empty_history():
+    telegrams = history()
+    assert telegrams.nearest(100) is None
+    assert telegrams.last_timestamp is None
+
+
+def test_nearest_message():
+    telegrams = history(message(10, "1.000"), message(20, "2.000"))
+    assert telegrams.nearest(14)["timestamp"] == 10
+    assert telegrams.nearest(16)["timestamp"] == 20
+    # The most recent message wins if both are equally close
+    assert telegrams.nearest(15)["timestamp"] == 20
+    assert telegrams.last_timestamp == 20
+
+
+def test_interpolate_between_messages():
+    telegrams = history(message(10, "1.000", "low"), message(20, "2.000", "normal"))
+    interpolated = telegrams.interpolate(12.5)
+    assert interpolated["energy_used_net"] == Decimal("1.250")
+    assert interpolated["timestamp"] == 12.5
+    # Values that are not Decimal are taken from the nearest message
+    assert interpolated["tariff"] == "low"
+    assert isinstance(interpolated, dict)
+
+
+def test_interpolate_at_boundaries():
+    first = message(10, "1.000")
+    last = message(20, "2.000")
+    telegrams = history(first, last)
+    # Before the first and after the last message the nearest message is used
+    assert telegrams.interpolate(5) is first
+    assert telegrams.interpolate(25) is last
+    # A message at the exact timestamp is not interpolated
+    assert telegrams.interpolate(10) is first
+    assert telegrams.interpolate(20) is last
+
+
+def test_out_of_order_and_expired_messages():
+    telegrams = history(
+        message(10, "1.000"), message(30, "3.000"), message(20, "2.000"), depth=2
+    )
+    assert len(telegrams) == 2
+    assert telegrams.nearest(0)["timestamp"] == 20
+    assert telegrams.last_timestamp == 30
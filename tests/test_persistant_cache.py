@@ -0,0 +1,72 @@
+import json
+import logging
+from decimal import Decimal
+
+import pytest
+
+from omnik.persistant_cache import JournalCache, PersistantCache
+
+logger = logging.getLogger("test")
+
+
+def test_write_behind(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = PersistantCache(path, 60, logger, None)
+    cache.update({"p1.last_total_energy": Decimal("100.5")})
+    # The change is written with the next flush
+    assert cache.dirty
+    cache.close()
+    assert not cache.dirty
+    with open(path) as cache_file:
+        assert json.load(cache_file) == {"p1.last_total_energy": 100.5}
+    assert PersistantCache(path, 60, logger, None).load() == {
+        "p1.last_total_energy": Decimal("100.5")
+    }
+
+
+def test_journal_replay(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = JournalCache(path, 0, logger, None)
+    cache.update({"p1.last_total_energy": Decimal("100.5")})
+    cache.update({"p1.last_total_energy": Decimal("101.5"), "p1.last_reset": "x"})
+    # Without close the journal is not compacted, like after a crash
+    loaded = JournalCache(path, 0, logger, None)
+    assert loaded.load() == {
+        "p1.last_total_energy": Decimal("101.5"),
+        "p1.last_reset": "x",
+    }
+    assert loaded.records == 2
+
+
+def test_journal_replay_after_partial_write(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = JournalCache(path, 0, logger, None)
+    cache.update({"p1.last_total_energy": Decimal("100.5")})
+    # A crash while writing leaves a partly written last record
+    with open(f"{path}.journal", "a") as journal:
+        journal.write('{"p1.last_total_energy":10')
+    loaded = JournalCache(path, 0, logger, None)
+    assert loaded.load() == {"p1.last_total_energy": Decimal("100.5")}
+    # The complete records were compacted, new records start a new journal
+    assert loaded.records == 0
+    with open(f"{path}.journal") as journal:
+        assert journal.read() == ""
+    loaded.update({"p1.last_total_energy": Decimal("102")})
+    assert JournalCache(path, 0, logger, None).load() == {
+        "p1.last_total_energy": Decimal("102")
+    }
+
+
+def test_journal_compacts_at_journal_size(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = JournalCache(path, 0, logger, None, journal_size=2)
+    cache.update({"a": 1})
+    cache.update({"b": 2})
+    assert cache.records == 0
+    with open(path) as cache_file:
+        assert json.load(cache_file) == {"a": 1, "b": 2}
+
+
+def test_missing_cache_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        JournalCache(str(tmp_path / "cache.json"), 0, logger, None).load()
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+import pytest
+
+from omnik.records import DsmrSample
+
+TELEGRAM = {
+    "timestamp": 1600000000.0,
+    "CURRENT_ELECTRICITY_USAGE": Decimal("0.244"),
+    "current_net_power": Decimal("244"),
+    "terminal": "meter",
+}
+
+
+def test_behaves_like_dict():
+    record = DsmrSample(TELEGRAM)
+    assert len(record) == len(TELEGRAM)
+    assert record
+    assert not DsmrSample()
+    assert record == TELEGRAM
+    assert TELEGRAM == record
+    assert record != dict(TELEGRAM, terminal="other")
+    assert record["current_net_power"] == Decimal("244")
+    assert record.get("gas_consumption_total") is None
+    assert record.get("gas_consumption_total", 0) == 0
+    assert "terminal" in record
+    assert "plant_id" not in record
+    with pytest.raises(KeyError):
+        record["plant_id"]
+
+
+def test_keeps_insertion_order():
+    data = dict(reversed(list(TELEGRAM.items())))
+    record = DsmrSample(data)
+    assert list(record) == list(data)
+    assert list(record.items()) == list(data.items())
+    assert list(record.values()) == list(data.values())
+    assert dict(record) == data
+
+
+def test_shares_field_index():
+    first = DsmrSample(TELEGRAM)
+    second = DsmrSample(dict(TELEGRAM, current_net_power=Decimal("-100")))
+    assert first._index is second._index
+    assert second["current_net_power"] == Decimal("-100")
+
+
+def test_is_read_only_and_copies_to_dict():
+    record = DsmrSample(TELEGRAM)
+    with pytest.raises(TypeError):
+        record["plant_id"] = "p1"
+    copy = record.copy()
+    assert type(copy) is dict
+    copy["plant_id"] = "p1"
+    assert "plant_id" not in record
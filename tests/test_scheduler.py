@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+
+import pytest
+
+from omnik import RepeatedJob
+from omnik.scheduler import Scheduler, Worker
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler(logging.getLogger("test"), None)
+    yield scheduler
+    scheduler.stop(1)
+
+
+def test_jobs_run_in_due_order(scheduler):
+    calls = []
+    done = threading.Event()
+    scheduler.schedule(0.2, lambda: (calls.append("last"), done.set()))
+    scheduler.schedule(0.1, calls.append, "second")
+    scheduler.schedule(0.05, calls.append, "first")
+    assert done.wait(2)
+    assert calls == ["first", "second", "last"]
+
+
+def test_cancelled_job_does_not_run(scheduler):
+    calls = []
+    done = threading.Event()
+    job = scheduler.schedule(0.05, calls.append, "cancelled")
+    scheduler.schedule(0.1, done.set)
+    job.cancel()
+    assert done.wait(2)
+    assert calls == []
+
+
+def test_repeated_job_until_cancelled(scheduler):
+    calls = []
+    job = scheduler.every(0.02, calls.append, "tick")
+    time.sleep(0.15)
+    job.cancel()
+    count = len(calls)
+    time.sleep(0.1)
+    assert count >= 3
+    assert len(calls) == count
+
+
+def test_failing_job_does_not_stop_scheduler(scheduler):
+    done = threading.Event()
+
+    def fail():
+        raise ValueError("failed")
+
+    scheduler.schedule(0.01, fail)
+    scheduler.schedule(0.05, done.set)
+    assert done.wait(2)
+
+
+def test_worker_runs_queued_calls_before_stopping():
+    calls = []
+    worker = Worker(logging.getLogger("test"), None)
+    worker.submit(time.sleep, 0.05)
+    worker.submit(calls.append, "queued")
+    worker.stop(1)
+    worker.submit(calls.append, "stopped")
+    time.sleep(0.05)
+    assert calls == ["queued"]
+    assert not worker._thread.is_alive()
+
+
+class Config(object):
+    def get(self, section, option, fallback=None):
+        return {"interval": 360}.get(option, fallback)
+
+
+class Client(object):
+    use_timer = True
+
+
+class DataLogger(object):
+    client = Client()
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.polling = threading.Event()
+        self.release = threading.Event()
+
+    def process(self):
+        self.polling.set()
+        # A poll blocks until the plants respond
+        self.release.wait(2)
+        return None
+
+
+def test_poll_does_not_block_scheduler(scheduler):
+    datalogger = DataLogger(scheduler)
+    job = RepeatedJob(Config(), datalogger, None)
+    assert datalogger.polling.wait(3)
+    done = threading.Event()
+    scheduler.schedule(0, done.set)
+    # Other jobs run while the poll is waiting
+    assert done.wait(1)
+    datalogger.release.set()
+    job.stop(1)
+    # The poll runs in one long lived worker that is stopped with the job
+    assert not job._poll_worker._thread.is_alive()